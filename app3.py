@@ -1,11 +1,18 @@
 import os
-import json
-import re
-import plotly.express as px
+import numpy as np
 import streamlit as st
 import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+import sheets_client
+import snapshot_cache
+import refresher
+import pivot_engine
+import filter_index
+import styling
+import tabel
+import grafik
+import perf
+import dataset_bersama
+import sumber_data
 
 # --- 1. KONFIGURASI HALAMAN (DIUPDATE UNTUK TAMPILAN APP) ---
 st.set_page_config(
@@ -17,18 +24,13 @@ st.set_page_config(
 
 # --- HIDE STREAMLIT STYLE (DIPERBAIKI) ---
 hide_streamlit_style = """
-            <style>
             #MainMenu {visibility: hidden;}
             footer {visibility: hidden;}
-            </style>
             """
-st.markdown(hide_streamlit_style, unsafe_allow_html=True)
 # -----------------------------------------------------------------------
 
-def set_background(image_url):
-    st.markdown(
-        f"""
-        <style>
+def css_background(image_url):
+    return f"""
         .stApp {{
             background-image: url("{image_url}");
             background-size: cover;
@@ -55,11 +57,17 @@ def set_background(image_url):
             text-shadow: none !important;
         }}
         /* ============================================================ */
-        
-        </style>
-        """,
-        unsafe_allow_html=True
-)
+        """
+
+# Semua CSS digabung jadi satu blok <style>, disusun sekali per proses.
+# Tetap dikirim tiap rerun (elemen yang tidak dikirim ulang dihapus Streamlit), tapi lewat
+# st.html yang isinya hanya <style> -> masuk event container, tidak ikut di-layout/di-render markdown.
+@st.cache_resource
+def css_aplikasi(image_url):
+    return f"<style>{hide_streamlit_style}{css_background(image_url)}</style>"
+
+def set_background(image_url):
+    st.html(css_aplikasi(image_url))
 
 # Background
 url_gambar = "https://images.unsplash.com/photo-1451187580459-43490279c0fa?q=80&w=2072&auto=format&fit=crop"
@@ -69,90 +77,211 @@ set_background(url_gambar)
 #  KONFIGURASI GOOGLE SHEET
 # ==========================================
 
-MAIN_SPREADSHEET_ID = "1mSHW1FQG19MTRD6nbqFdrP_6klm_uUD-XhWIHEaup_o"
-SECOND_SPREADSHEET_ID = "19l9TLgZb8kjNnq3wbxG2U5slNphOQhNbBy4KK3zoXnA" 
+# Tab, range, batch, rollup & daftar DATASET ada di konfigurasi.py, dibaca juga oleh worker precompute.py
+from konfigurasi import (
+    MAIN_SPREADSHEET_ID, SECOND_SPREADSHEET_ID,
+    TAB_NAME_TEKNISI, TAB_NAME_IOAN, TAB_NAME_PSB, TAB_NAME_B2B, TAB_NAME_RAW_DATA,
+    CACHE_TTL, RANGE_IOAN_SLA, RANGE_IOAN_MSA, RANGE_IOAN_LATEN, RANGE_PSB_KPI,
+    TAB_DELTA_SYNC, KOLOM_TEKNISI, ROLLUP_DIMENSI, DATASET, SNAPSHOT_DIR, SNAPSHOT_ONLY,
+)
+
+PIVOT_CACHE_MAX = 64
+# Tabel lebih panjang dari ini ditampilkan per halaman (cari & urut dikerjakan di server)
+BARIS_PER_HALAMAN = 100
+
+# Aturan pewarnaan per dashboard (sheet_id, nama_tab, range) -> tuple styling.Aturan.
+# Dashboard yang tidak terdaftar memakai aturan bawaan: baris dengan kolom kunci < 100 diwarnai merah.
+# Contoh: (styling.Aturan(None, "<", 100, styling.STYLE_MERAH), styling.Aturan(None, ">=", 120, "background-color: #ccffcc", False))
+ATURAN_WARNA = {}
 
-TAB_NAME_TEKNISI = "ALL TEKNISI TNS"
-TAB_NAME_IOAN    = "CEK IOAN"
-TAB_NAME_PSB     = "CEK PSB"
-TAB_NAME_B2B     = "Data B2B"
-TAB_NAME_RAW_DATA = "BANK DATA ALL 2025" 
+WARMUP_WORKERS = 4
+
+# Instrumentasi: halaman admin tersembunyi dibuka lewat URL ?admin=<ADMIN_KEY>.
+# Tanpa env ADMIN_KEY halaman admin mati (tidak ada kunci bawaan).
+# PERF_LOG=<file.jsonl> menulis setiap span sebagai JSON lines,
+# PERF_METRICS_PORT=<port> membuka endpoint teks Prometheus di http://host:port/metrics
+# (PERF_METRICS_HOST, default 127.0.0.1; isi 0.0.0.0 kalau Prometheus ada di mesin lain).
+ADMIN_KEY = os.environ.get("ADMIN_KEY")
 
 # ==========================================
 
 # --- FUNGSI TAMBAHAN: MEMBERSIHKAN NAMA KOLOM ---
-def bersihkan_nama_kolom_display(df_input):
-    df_display = df_input.copy()
-    new_column_names = {}
-    for col in df_display.columns:
-        clean_name = re.sub(r'_\d+$', '', col)
-        new_column_names[col] = clean_name
-    df_display = df_display.rename(columns=new_column_names)
-    return df_display
+# Akhiran _1, _2 dibuang hanya di label tabel (column_config), frame data tidak disalin/di-rename
+def label_kolom_display(df_input):
+    return dataset_bersama.label_kolom(df_input.columns)
 
 # --- 2. FUNGSI KONEKSI ---
-@st.cache_data(ttl=60)
-def load_data(sheet_id, nama_tab_spesifik, range_cell=None):
+# Ambil, bersihkan, deteksi tipe & rollup ada di sumber_data.py (dipakai juga oleh worker precompute.py)
+
+# Satu pool koneksi untuk seluruh proses, jadi token & handle worksheet dipakai ulang antar session.
+@st.cache_resource
+def get_sheets_pool():
+    return sumber_data.buat_pool(st.secrets)
+
+@st.cache_resource
+def get_delta_sync(sheet_id, nama_tab):
+    return sheets_client.DeltaSync(get_sheets_pool(), sheet_id, nama_tab)
+
+# Satu frame per dataset & versi di memori proses, dipakai bersama semua session
+@st.cache_resource
+def get_dataset_bersama():
+    return dataset_bersama.DatasetBersama()
+
+# Snapshot hasil load_data di disk, supaya setelah restart halaman bisa langsung tampil
+@st.cache_resource
+def get_snapshot_store():
+    return snapshot_cache.SnapshotStore(SNAPSHOT_DIR)
+
+def fungsi_ambil(sheet_id, nama_tab, range_cell=None):
+    delta_sync = None
+    if not range_cell and (sheet_id, nama_tab) in TAB_DELTA_SYNC:
+        delta_sync = get_delta_sync(sheet_id, nama_tab)
+    return sumber_data.fungsi_ambil(get_sheets_pool(), sheet_id, nama_tab, range_cell, delta_sync)
+
+# Satu thread refresher per proses server untuk semua dataset di DATASET.
+# Putaran pertama dikerjakan warm-up, jadi refresh rutin baru mulai setelah satu interval.
+@st.cache_resource
+def get_refresher():
+    bg = refresher.Refresher(get_snapshot_store())
+    for (sheet_id, nama_tab, range_cell), interval in DATASET.items():
+        bg.daftar(
+            (sheet_id, nama_tab, range_cell),
+            fungsi_ambil(sheet_id, nama_tab, range_cell),
+            interval,
+            kunci_fetch=sumber_data.kunci_fetch(sheet_id, nama_tab, range_cell),
+            tunda=interval,
+        )
+    return bg.start()
+
+# Warm-up paralel semua dataset saat app pertama kali jalan (sekali per proses server)
+@st.cache_resource
+def get_warmup():
+    daftar = [
+        (key, fungsi_ambil(*key), interval, sumber_data.kunci_fetch(*key))
+        for key, interval in DATASET.items()
+    ]
+    return refresher.WarmUp(get_snapshot_store(), max_workers=WARMUP_WORKERS).mulai(daftar)
+
+# cache_resource (bukan cache_data): semua session menerima frame yang sama, tidak di-copy per panggilan
+@st.cache_resource(ttl=CACHE_TTL, show_spinner=False)
+def _load_data_cache(sheet_id, nama_tab_spesifik, range_cell=None):
+    # Badan fungsi hanya jalan kalau cache Streamlit miss
+    perf.tandai(cache="miss")
     try:
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        
-        if "GCP_JSON" in os.environ:
-            creds_dict = json.loads(os.environ["GCP_JSON"])
-            creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-        elif "gcp_service_account" in st.secrets:
-            creds_dict = st.secrets["gcp_service_account"]
-            creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-        else:
-            creds = ServiceAccountCredentials.from_json_keyfile_name("kredensial.json", scope)
-
-        client = gspread.authorize(creds)
-        sh = client.open_by_key(sheet_id)
-        worksheet = sh.worksheet(nama_tab_spesifik)
-
-        if range_cell:
-            data = worksheet.get(range_cell)
-        else:
-            data = worksheet.get_all_values()
-        
-        if len(data) > 0:
-            headers = data[0]
-            seen = {}
-            new_headers = []
-            for h in headers:
-                h = str(h).strip() 
-                if h in seen:
-                    seen[h] += 1
-                    new_headers.append(f"{h}_{seen[h]}")
-                else:
-                    seen[h] = 0
-                    new_headers.append(h)
-            
-            df = pd.DataFrame(data[1:], columns=new_headers)
-            
-            for col in df.columns:
-                try:
-                    if df[col].astype(str).str.isnumeric().all():
-                        df[col] = pd.to_numeric(df[col], errors='ignore')
-                except:
-                    pass
-            return df
+        key = (sheet_id, nama_tab_spesifik, range_cell)
+        if SNAPSHOT_ONLY:
+            # Mode baca saja: data hanya datang dari worker precompute.py
+            df, _ = get_snapshot_store().baca(key)
+            if df is None:
+                st.warning("⏳ Data ini belum disiapkan oleh worker precompute.")
+                return pd.DataFrame()
         else:
-            return pd.DataFrame()
+            # Snapshot lama langsung dipakai. Refresh rutin dikerjakan refresher sesuai interval di DATASET;
+            # halaman baru memicu refresh sendiri kalau snapshot sudah lewat 2x interval itu (refresher tertinggal)
+            df = get_snapshot_store().muat(
+                key,
+                fungsi_ambil(sheet_id, nama_tab_spesifik, range_cell),
+                ttl=DATASET.get(key, CACHE_TTL) * 2,
+                kunci_fetch=sumber_data.kunci_fetch(sheet_id, nama_tab_spesifik, range_cell),
+            )
+        return get_dataset_bersama().bagikan(key, df)
 
     except Exception as e:
         st.error(f"❌ Terjadi Kesalahan Koneksi: {e}")
         return pd.DataFrame()
 
+def load_data(sheet_id, nama_tab_spesifik, range_cell=None):
+    with perf.span("load_data", tab=nama_tab_spesifik, range=range_cell, cache="hit") as s:
+        df = _load_data_cache(sheet_id, nama_tab_spesifik, range_cell)
+        s.update(perf.ukuran_df(df))
+    # View copy-on-write: halaman boleh mengubah view-nya tanpa menyentuh frame bersama
+    return dataset_bersama.view(df)
+
+# Rollup ikut disimpan sebagai snapshot saat data di-refresh (lihat ambil_dari_google)
+@st.cache_resource(ttl=CACHE_TTL, show_spinner=False)
+def _load_rollup_cache(sheet_id, nama_tab):
+    hasil = []
+    for i in range(len(ROLLUP_DIMENSI.get((sheet_id, nama_tab), ()))):
+        key = (sheet_id, nama_tab, None, 'rollup', i)
+        cube, _ = get_snapshot_store().baca(key)
+        if cube is not None:
+            hasil.append(get_dataset_bersama().bagikan(key, cube))
+    return sorted(hasil, key=len)
+
+# Hasil: daftar cube (bisa kosong), urut dari yang terkecil
+def load_rollup(sheet_id, nama_tab):
+    return [dataset_bersama.view(cube) for cube in _load_rollup_cache(sheet_id, nama_tab)]
+
+@st.cache_resource
+def get_perekam():
+    perf.PEREKAM.file_log = os.environ.get("PERF_LOG")
+    if "PERF_METRICS_PORT" in os.environ:
+        perf.mulai_server_metrics(int(os.environ["PERF_METRICS_PORT"]), host=os.environ.get("PERF_METRICS_HOST", "127.0.0.1"))
+    return perf.PEREKAM
+
 # --- 3. FUNGSI PEWARNAAN ---
-def highlight_dynamic(row, nama_kolom):
-    try:
-        nilai = float(row[nama_kolom])
-        if nilai < 100:
-            return ['background-color: #ffcccc; color: black'] * len(row)
-        else:
-            return [''] * len(row)
-    except:
-        return [''] * len(row)
+# Ada di styling.py (aturan per dashboard, CSS dihitung sebagai mask vektor), dipakai juga oleh benchmark.py
+
+# --- FUNGSI TAMBAHAN: TABEL BERHALAMAN (PENGGANTI st.dataframe) ---
+# Yang dikirim ke browser hanya baris di halaman yang sedang dilihat; pencarian & pengurutan
+# dihitung di server atas frame yang sudah di-cache, hasilnya (posisi baris) di-cache per versi.
+@st.cache_data(max_entries=64, show_spinner=False)
+def _load_posisi_cache(_df, versi, cari, kolom_urut, naik, dengan_index):
+    return tabel.posisi_tampil(_df, cari, kolom_urut, naik, dengan_index)
+
+def load_posisi(df, versi, cari, kolom_urut, naik, dengan_index):
+    if versi is None:
+        return tabel.posisi_tampil(df, cari, kolom_urut, naik, dengan_index)
+    return _load_posisi_cache(df, versi, cari, kolom_urut, naik, dengan_index)
+
+def nama_kolom_tampil(kolom):
+    if kolom is None:
+        return "(urutan asli)"
+    return ' - '.join(map(str, kolom)) if isinstance(kolom, tuple) else str(kolom)
+
+def tampilkan_tabel(df, key, versi=None, hide_index=True, styler=None, label_kolom=None):
+    # versi: kunci cache frame ini (harus berubah kalau isi df berubah); None = tanpa cache.
+    # styler(posisi) -> Styler untuk baris-baris tersebut saja.
+    # label_kolom: {nama kolom: judul yang ditampilkan}, dikirim sebagai column_config.
+    # Kolom tanggal ditampilkan dd/mm/yyyy, sama seperti label tanggal di pivot.
+    label_kolom = label_kolom or {}
+    column_config = {kolom: st.column_config.Column(label) for kolom, label in label_kolom.items()}
+    for kolom, tipe in df.dtypes.items():
+        if pd.api.types.is_datetime64_any_dtype(tipe):
+            column_config[kolom] = st.column_config.DatetimeColumn(label_kolom.get(kolom), format="DD/MM/YYYY")
+    column_config = column_config or None
+    if len(df) <= BARIS_PER_HALAMAN:
+        with perf.span("render", **perf.ukuran_df(df)):
+            st.dataframe(styler(np.arange(len(df))) if styler else df, use_container_width=True, hide_index=hide_index, column_config=column_config)
+        return
+
+    def reset_halaman():
+        st.session_state[f"{key}_halaman"] = 1
+
+    pilihan_urut = [None] + (list(df.columns) if hide_index else [n for n in df.index.names if n] + list(df.columns))
+    col1, col2, col3 = st.columns([3, 2, 1])
+    with col1:
+        cari = st.text_input("🔍 Cari", key=f"{key}_cari", on_change=reset_halaman)
+    with col2:
+        kolom_urut = st.selectbox("Urutkan", pilihan_urut, format_func=lambda k: nama_kolom_tampil(label_kolom.get(k, k)), key=f"{key}_urut", on_change=reset_halaman)
+    with col3:
+        arah = st.selectbox("Arah", ["Naik", "Turun"], key=f"{key}_arah", on_change=reset_halaman)
+
+    posisi = load_posisi(df, versi, cari.strip() or None, kolom_urut, arah == "Naik", not hide_index)
+    jumlah_halaman = max(1, -(-len(posisi) // BARIS_PER_HALAMAN))
+    if st.session_state.get(f"{key}_halaman", 1) > jumlah_halaman:
+        st.session_state[f"{key}_halaman"] = jumlah_halaman
+    halaman = st.number_input(f"Halaman (dari {jumlah_halaman:,})", min_value=1, max_value=jumlah_halaman, key=f"{key}_halaman")
+
+    awal = (halaman - 1) * BARIS_PER_HALAMAN
+    potong = posisi[awal:awal + BARIS_PER_HALAMAN]
+    tampil = styler(potong) if styler else df.iloc[potong]
+    with perf.span("render", total_baris=len(df), **perf.ukuran_df(df.iloc[potong])):
+        st.dataframe(tampil, use_container_width=True, hide_index=hide_index, column_config=column_config)
+    keterangan = f"Menampilkan baris {awal + 1 if len(potong) else 0:,}–{awal + len(potong):,} dari {len(posisi):,}"
+    if cari.strip():
+        keterangan += f" (hasil pencarian dari {len(df):,} baris)"
+    st.caption(keterangan)
 
 # --- 4. NAVIGASI ---
 if 'page' not in st.session_state:
@@ -161,10 +290,31 @@ if 'page' not in st.session_state:
 def go_to(page_name):
     st.session_state.page = page_name
 
+# Halaman admin tidak ada di menu, hanya bisa dibuka lewat query param
+if ADMIN_KEY and st.query_params.get("admin") == ADMIN_KEY:
+    del st.query_params["admin"]
+    go_to('admin_perf')
+
 # --- 5. HALAMAN: LANDING PAGE ---
+IKON_STATUS = {"menunggu": "⏳", "memuat": "🔄", "siap": "✅", "gagal": "❌"}
+
+# Progres warm-up; hanya fragment ini yang di-rerun tiap detik, bukan seluruh halaman
+@st.fragment(run_every=1)
+def show_status_warmup():
+    warmup = get_warmup()
+    if warmup.selesai():
+        # Rerun penuh sekali: landing page tidak memanggil fragment ini lagi, jadi jadwal tiap detik berhenti
+        st.rerun()
+    st.progress(warmup.progres(), text="Menyiapkan data dashboard...")
+    with st.expander("Status data"):
+        for (sheet_id, nama_tab, range_cell), status in warmup.status().items():
+            st.caption(f"{IKON_STATUS[status]} {nama_tab} {range_cell or ''}")
+
 def show_landing_page():
     st.markdown("<h1 style='text-align: center;'>Dashboard Monitoring Performansi SA TANDES</h1>", unsafe_allow_html=True)
     st.markdown("---")
+    if not SNAPSHOT_ONLY and not get_warmup().selesai():
+        show_status_warmup()
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -261,14 +411,15 @@ def show_teknisi_detail(jenis, kolom_start, kolom_end):
     st.title(f"Data Teknisi - {jenis}")
     
     with st.spinner('Mengambil data...'):
-        df_full = load_data(MAIN_SPREADSHEET_ID, TAB_NAME_TEKNISI)
+        # Hanya kolom halaman ini yang diambil; baris tanpa nama sudah dibuang saat data masuk
+        df_filtered = load_data(MAIN_SPREADSHEET_ID, TAB_NAME_TEKNISI, sheets_client.range_kolom(kolom_start, kolom_end))
     
-    if not df_full.empty:
+    if not df_filtered.empty:
         try:
-            df_filtered = df_full.iloc[:, kolom_start:kolom_end]
-            df_filtered = df_filtered[df_filtered.iloc[:, 0].astype(str).str.strip() != ""]
-            df_clean = bersihkan_nama_kolom_display(df_filtered)
-            st.dataframe(df_clean, use_container_width=True, hide_index=True)
+            tampilkan_tabel(
+                df_filtered, f"teknisi_{jenis}", versi=df_filtered.attrs.get('versi'),
+                label_kolom=label_kolom_display(df_filtered),
+            )
         except Exception as e:
             st.error(f"Gagal memotong kolom: {e}")
     else:
@@ -291,18 +442,89 @@ def show_dashboard(judul, nama_tab, target_sheet_id, range_khusus=None, kolom_ku
 
     if not df.empty:
         if kolom_kunci in df.columns:
-            df_display = df.copy() 
-            df_display[kolom_kunci] = df_display[kolom_kunci].astype(str).str.replace(',', '.', regex=False)
-            df_display[kolom_kunci] = pd.to_numeric(df_display[kolom_kunci], errors='coerce').fillna(0)
-            
-            styled_df = df_display.style.apply(lambda row: highlight_dynamic(row, kolom_kunci), axis=1)
-            styled_df = styled_df.format({kolom_kunci: "{:.2f}"})
-            st.dataframe(styled_df, use_container_width=True, hide_index=True)
+            aturan = ATURAN_WARNA.get((target_sheet_id, nama_tab, range_khusus))
+            versi = df.attrs.get('versi')
+            with perf.span("styler", cache="hit", **perf.ukuran_df(df)):
+                df_display, css = load_tampilan(df, versi, kolom_kunci, aturan)
+            # Style hanya diterapkan ke baris di halaman yang tampil
+            tampilkan_tabel(
+                df_display, f"dashboard_{nama_tab}_{range_khusus}", versi=versi and (versi, kolom_kunci),
+                styler=lambda posisi: styling.styler_dari_css(df_display.iloc[posisi], css.iloc[posisi], kolom_kunci),
+            )
         else:
-            st.dataframe(df, use_container_width=True, hide_index=True)
+            tampilkan_tabel(df, f"dashboard_{nama_tab}_{range_khusus}", versi=df.attrs.get('versi'))
     else:
         st.warning(f"Data tidak ditemukan di tab: {nama_tab}")
 
+# Tabel tampilan + CSS hasil aturan pewarnaan dihitung sekali per versi data;
+# rerun hanya membungkusnya lagi jadi Styler (murah), tanpa menghitung ulang style.
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _load_tampilan_cache(_df, versi, kolom_kunci, aturan):
+    perf.tandai(cache="miss")
+    return styling.siapkan_styler(_df, kolom_kunci, aturan)
+
+def load_tampilan(df, versi, kolom_kunci, aturan=None):
+    if versi is None:
+        return styling.siapkan_styler(df, kolom_kunci, aturan)
+    return _load_tampilan_cache(df, versi, kolom_kunci, aturan)
+
+# Indeks filter dibangun sekali per versi data dan dipakai bersama semua session (tidak di-copy)
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_filter_index_cache(_df, versi):
+    return filter_index.FilterIndex(_df)
+
+def load_filter_index(df, versi):
+    if versi is None:
+        return filter_index.FilterIndex(df)
+    return _load_filter_index_cache(df, versi)
+
+# Kunci urutan (tanggal/bulan/angka/teks) per kolom, juga sekali per versi data
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_urutan_cache(_df, versi):
+    return pivot_engine.UrutanKolom(_df)
+
+def load_urutan(df, versi):
+    if versi is None:
+        return pivot_engine.UrutanKolom(df)
+    return _load_urutan_cache(df, versi)
+
+# Hasil pivot (sudah diurutkan) di-cache per versi data + filter + pengaturan pivot, satu salinan per proses.
+# max_entries membatasi jumlah entri; yang paling lama tidak dipakai dibuang duluan.
+@st.cache_resource(max_entries=PIVOT_CACHE_MAX, show_spinner=False)
+def _load_pivot_cache(_df, versi, kunci_filter, rows, cols, values, agg_func, _rollup=None, _urutan=None):
+    perf.tandai(cache="miss")
+    return pivot_engine.hitung_pivot(_df, list(rows), list(cols), values, agg_func, _rollup, kunci_filter, _urutan)
+
+def load_pivot(df, versi, kunci_filter, rows, cols, values, agg_func, rollup=None, urutan=None):
+    with perf.span("pivot", agg=agg_func, cache="hit" if versi else "tanpa_cache") as s:
+        if versi is None:
+            hasil = pivot_engine.hitung_pivot(df, list(rows), list(cols), values, agg_func, urutan=urutan)
+        else:
+            # Rollup hanya dipakai kalau dibangun dari versi data yang sama
+            if rollup:
+                rollup = [cube for cube in rollup if cube.attrs.get('versi') == versi]
+            hasil = dataset_bersama.view(_load_pivot_cache(df, versi, kunci_filter, rows, cols, values, agg_func, rollup, urutan))
+        s.update(perf.ukuran_df(hasil))
+    return hasil
+
+# Figure grafik per hasil pivot + jenis grafik. Yang di-cache objek Figure-nya (bukan JSON),
+# karena st.plotly_chart memvalidasi ulang kalau diberi dict/JSON.
+JENIS_GRAFIK = {
+    "📊 Bar Chart (Perbandingan)": 'bar',
+    "📈 Line Chart (Tren Waktu)": 'line',
+    "🍩 Pie Chart (Proporsi)": 'pie',
+}
+
+@st.cache_resource(max_entries=PIVOT_CACHE_MAX, show_spinner=False)
+def _load_grafik_cache(_pivot_result, kunci_pivot, jenis, agg_func):
+    perf.tandai(cache="miss")
+    return grafik.buat_grafik(_pivot_result, jenis, agg_func)
+
+def load_grafik(pivot_result, kunci_pivot, jenis, agg_func):
+    if kunci_pivot is None:
+        return grafik.buat_grafik(pivot_result, jenis, agg_func)
+    return _load_grafik_cache(pivot_result, kunci_pivot, jenis, agg_func)
+
 # --- 11. HALAMAN BARU: PIVOT TABLE (FINAL + GRAFIK INTERAKTIF) ---
 def show_interactive_pivot():
     st.button("⬅️ Kembali ke Pilihan PSB", on_click=lambda: go_to('psb_menu_pilihan'))
@@ -312,29 +534,40 @@ def show_interactive_pivot():
         df = load_data(SECOND_SPREADSHEET_ID, TAB_NAME_RAW_DATA)
         
     if not df.empty:
+        # Tipe kolom sudah dideteksi sekali saat data diambil (data_prep.infer_types)
         df = df.loc[:, ~df.columns.duplicated()]
-        for col in df.columns:
-            try:
-                if df[col].astype(str).str.isnumeric().all():
-                    df[col] = pd.to_numeric(df[col], errors='ignore')
-            except: pass
 
         all_columns = df.columns.tolist()
         
-        # --- FILTER SIDEBAR ---
+        # --- FILTER SIDEBAR (BISA BEBERAPA KOLOM SEKALIGUS) ---
+        indeks = load_filter_index(df, df.attrs.get('versi'))
+        urutan = load_urutan(df, df.attrs.get('versi'))
         st.sidebar.markdown("### 🔎 Panel Filter Data")
         st.sidebar.info("Gunakan menu ini untuk menyaring data.")
-        kolom_filter = st.sidebar.selectbox("Pilih Kolom:", ["- Tidak Ada -"] + all_columns)
+        kolom_filter = st.sidebar.multiselect("Pilih Kolom:", all_columns)
+        kunci_filter = []
+        belum_dipilih = []
         
-        if kolom_filter != "- Tidak Ada -":
-            unique_values = df[kolom_filter].unique().tolist()
-            selected_values = st.sidebar.multiselect(f"Pilih isi '{kolom_filter}':", unique_values)
+        for kolom in kolom_filter:
+            unique_values = indeks.unik(kolom) if indeks.punya(kolom) else df[kolom].unique().tolist()
+            unique_values = urutan.urutkan_nilai(kolom, unique_values)
+            selected_values = st.sidebar.multiselect(
+                f"Pilih isi '{kolom}':", unique_values, format_func=pivot_engine._fmt_tanggal
+            )
             if selected_values:
-                df = df[df[kolom_filter].isin(selected_values)]
-                st.sidebar.success(f"✅ {len(df)} baris data ditemukan.")
+                kunci_filter.append((kolom, tuple(selected_values)))
             else:
-                st.warning(f"⚠️ Anda memilih filter '{kolom_filter}' tapi belum memilih isinya.")
-                df = pd.DataFrame() 
+                belum_dipilih.append(kolom)
+        kunci_filter = tuple(kunci_filter) or None
+
+        if belum_dipilih:
+            st.warning(f"⚠️ Anda memilih filter '{', '.join(belum_dipilih)}' tapi belum memilih isinya.")
+            df = pd.DataFrame() 
+        elif kunci_filter:
+            with perf.span("filter", kolom=len(kunci_filter)) as s:
+                df = indeks.terapkan(df, kunci_filter)
+                s["baris"] = len(df)
+            st.sidebar.success(f"✅ {len(df)} baris data ditemukan.")
 
         st.markdown("---")
         
@@ -363,138 +596,146 @@ def show_interactive_pivot():
             st.markdown("---")
             if rows:
                 try:
-                    if agg_func != 'count':
-                        df[values] = pd.to_numeric(df[values], errors='coerce').fillna(0)
-
-                    pivot_result = pd.pivot_table(
-                        df, index=rows, columns=cols if cols else None, 
-                        values=values, aggfunc=agg_func, fill_value=0,
-                        margins=True, margins_name='Grand Total'
-                    )
-
-                    def smart_sort_index(index_obj):
-                        try:
-                            labels = index_obj.astype(str).tolist()
-                            try:
-                                dates = pd.to_datetime(labels, dayfirst=True, errors='coerce')
-                                if dates.notna().sum() > len(dates) * 0.5: return dates.argsort()
-                            except: pass
-                            bulan_map = {'JANUARI':1,'JAN':1,'FEBRUARI':2,'FEB':2,'MARET':3,'MAR':3,'APRIL':4,'APR':4,'MEI':5,'MAY':5,'JUNI':6,'JUN':6,'JULI':7,'JUL':7,'AGUSTUS':8,'AGT':8,'SEPTEMBER':9,'SEP':9,'OKTOBER':10,'OKT':10,'NOVEMBER':11,'NOV':11,'DESEMBER':12,'DES':12,'GRAND TOTAL':999}
-                            sample = labels[0].strip().upper().split(' ')[0]
-                            if sample in bulan_map:
-                                rank_list = [bulan_map.get(i.strip().upper().split(' ')[0], 50) for i in labels]
-                                return pd.Series(rank_list).argsort()
-                            return index_obj.argsort()
-                        except: return range(len(index_obj))
-
-                    if cols:
-                        is_grand_total = pivot_result.columns == 'Grand Total'
-                        if not is_grand_total.all():
-                            data_cols = pivot_result.columns[~is_grand_total]
-                            total_col = pivot_result.columns[is_grand_total]
-                            pivot_result = pivot_result[data_cols[smart_sort_index(data_cols)].tolist() + total_col.tolist()]
-
-                    if 'Grand Total' in pivot_result.index:
-                        data_rows = pivot_result.index.drop('Grand Total')
-                        pivot_result = pivot_result.reindex(data_rows[smart_sort_index(data_rows)].tolist() + ['Grand Total'])
+                    rollup = load_rollup(SECOND_SPREADSHEET_ID, TAB_NAME_RAW_DATA)
+                    pivot_result = load_pivot(df, df.attrs.get('versi'), kunci_filter, tuple(rows), tuple(cols), values, agg_func, rollup, urutan)
 
                     st.subheader(f"📊 Hasil Analisa: {agg_func.upper()} of {values}")
-                    st.dataframe(pivot_result, use_container_width=True)
+                    versi = df.attrs.get('versi')
+                    kunci_pivot = versi and (versi, kunci_filter, tuple(rows), tuple(cols), values, agg_func)
+                    tampilkan_tabel(pivot_result, "pivot", versi=kunci_pivot, hide_index=False)
 
                     # VISUALISASI GRAFIK
                     st.markdown("### 📈 Visualisasi Grafik")
-                    chart_df = pivot_result.copy()
-                    if 'Grand Total' in chart_df.index: chart_df = chart_df.drop('Grand Total', axis=0)
-                    if 'Grand Total' in chart_df.columns: chart_df = chart_df.drop(columns=['Grand Total'])
-                    
-                    if isinstance(chart_df.columns, pd.MultiIndex):
-                        chart_df.columns = [' - '.join(map(str, col)).strip() for col in chart_df.columns.values]
-
-                    if not chart_df.empty:
-                        chart_data_clean = chart_df.reset_index()
-                        x_axis_name = chart_data_clean.columns[0]
-                        
-                        jenis_grafik = st.radio("Tampilan Grafik:", ["📊 Bar Chart (Perbandingan)", "📈 Line Chart (Tren Waktu)", "🍩 Pie Chart (Proporsi)"], horizontal=True)
-                        fig = None
-                        
-                        if jenis_grafik == "📊 Bar Chart (Perbandingan)":
-                            if len(chart_df.columns) == 1:
-                                y_axis_name = chart_df.columns[0]
-                                fig = px.bar(chart_data_clean, x=x_axis_name, y=y_axis_name, text_auto=True, color=y_axis_name)
-                            else:
-                                chart_melted = chart_data_clean.melt(id_vars=x_axis_name, var_name='Kategori', value_name='Jumlah')
-                                fig = px.bar(chart_melted, x=x_axis_name, y='Jumlah', color='Kategori', text_auto=True, barmode='group')
-
-                        elif jenis_grafik == "📈 Line Chart (Tren Waktu)":
-                            if len(chart_df.columns) == 1:
-                                y_axis_name = chart_df.columns[0]
-                                fig = px.line(chart_data_clean, x=x_axis_name, y=y_axis_name, markers=True)
-                            else:
-                                chart_melted = chart_data_clean.melt(id_vars=x_axis_name, var_name='Kategori', value_name='Jumlah')
-                                fig = px.line(chart_melted, x=x_axis_name, y='Jumlah', color='Kategori', markers=True)
-
-                        elif jenis_grafik == "🍩 Pie Chart (Proporsi)":
-                            if len(chart_df.columns) == 1:
-                                y_axis_name = chart_df.columns[0]
-                                fig = px.pie(chart_data_clean, names=x_axis_name, values=y_axis_name, hole=0.4)
-                            else:
-                                st.warning("⚠️ Pie Chart hanya untuk data 1 kolom.")
-
-                        if fig: st.plotly_chart(fig, use_container_width=True)
-                    else:
-                        st.warning("Data tidak cukup untuk membuat grafik.")
+                    jenis_grafik = st.radio("Tampilan Grafik:", list(JENIS_GRAFIK), horizontal=True)
+                    with perf.span("plotly", jenis=JENIS_GRAFIK[jenis_grafik], cache="hit" if kunci_pivot else "tanpa_cache"):
+                        fig, pesan = load_grafik(pivot_result, kunci_pivot, JENIS_GRAFIK[jenis_grafik], agg_func)
+
+                    if pesan:
+                        st.warning(pesan)
+                    if fig:
+                        with perf.span("render_grafik"):
+                            st.plotly_chart(fig, use_container_width=True)
 
                 except Exception as e:
                     st.error(f"Gagal memproses data: {e}")
             else:
                 st.info("👈 Silakan pilih minimal satu 'Baris (Rows)' di menu pengaturan.")
 
-# --- 12. ROUTING UTAMA ---
-if st.session_state.page == 'landing':
-    show_landing_page()
-
-# Routing Teknisi
-elif st.session_state.page == 'teknisi_menu_pilihan':
-    show_teknisi_menu_pilihan()
-elif st.session_state.page == 'teknisi_ioan_detail':
-    show_teknisi_detail("IOAN", 3, 6)
-elif st.session_state.page == 'teknisi_psb_detail':
-    show_teknisi_detail("PSB", 6, 9) 
-elif st.session_state.page == 'teknisi_b2b_detail':
-    show_teknisi_detail("B2B", 0, 3) 
-
-# Routing PSB
-elif st.session_state.page == 'psb_menu_pilihan':
-    show_psb_menu_pilihan()
-
-elif st.session_state.page == 'psb_utama':
-    show_dashboard(
-        "KPI IMBAL JASA PROVISIONING SA TANDES", TAB_NAME_PSB, MAIN_SPREADSHEET_ID, 
-        range_khusus="A7:F15", kolom_kunci="ACHIEVEMENT", back_to='psb_menu'
-    )
-
-elif st.session_state.page == 'psb_pivot_interaktif':
-    show_interactive_pivot()
-
-# --- [UPDATE] Routing IOAN ---
-elif st.session_state.page == 'ioan_menu_pilihan':
-    show_ioan_menu_pilihan() # Menampilkan menu pilihan
-
-elif st.session_state.page == 'ioan':
-    # Dashboard Lama (A1:K29)
-    show_dashboard("Performansi SLA Imbal Jasa IOAN", TAB_NAME_IOAN, MAIN_SPREADSHEET_ID, range_khusus="A1:K29", kolom_kunci="SCORE", back_to='ioan_menu')
-
-elif st.session_state.page == 'ioan_tambahan':
-    # Dashboard Kedua (M9:Q25)
-    show_dashboard("Performansi MSA-WSA IOAN", TAB_NAME_IOAN, MAIN_SPREADSHEET_ID, range_khusus="M9:Q25", kolom_kunci="ACHIEVEMENT", back_to='ioan_menu')
-
-elif st.session_state.page == 'ioan_baru_lagi':
-    # Dashboard Ketiga (T9:Y21) -> INI YANG BARU
-    show_dashboard("PI LATEN", TAB_NAME_IOAN, MAIN_SPREADSHEET_ID, range_khusus="T9:Y21", kolom_kunci="ACHIEVEMENT", back_to='ioan_menu')
-
-# Routing B2B
-elif st.session_state.page == 'b2b':
-    show_dashboard("Performansi B2B", TAB_NAME_B2B, MAIN_SPREADSHEET_ID, kolom_kunci="SCORE")
+# --- 12. HALAMAN ADMIN: PERFORMA (TERSEMBUNYI) ---
+def show_admin_perf():
+    st.button("⬅️ Kembali ke Menu Utama", on_click=lambda: go_to('landing'))
+    st.title("⏱️ Performa Dashboard")
+    perekam = get_perekam()
+
+    ringkasan = perekam.ringkasan()
+    if not ringkasan:
+        st.info("Belum ada span yang tercatat.")
+    else:
+        df_ringkasan = pd.DataFrame.from_dict(ringkasan, orient='index')
+        df_ringkasan.index = df_ringkasan.index.set_names(['halaman', 'tahap'])
+        st.subheader("Ringkasan per halaman & tahap")
+        tampilkan_tabel(df_ringkasan, "admin_ringkasan", hide_index=False)
+
+        if perf.WAKTU_IMPOR:
+            st.subheader("Waktu import modul (sekali per proses)")
+            tampilkan_tabel(
+                pd.DataFrame({'modul': list(perf.WAKTU_IMPOR), 'ms': list(perf.WAKTU_IMPOR.values())}), "admin_impor",
+            )
+
+        bersama = get_dataset_bersama().daftar()
+        if bersama:
+            st.subheader("Dataset bersama di memori (satu salinan per proses)")
+            tampilkan_tabel(
+                pd.DataFrame([
+                    {'dataset': ' / '.join(str(k) for k in key[1:] if k), 'versi': df.attrs.get('versi'), **perf.ukuran_df(df)}
+                    for key, df in bersama.items()
+                ]),
+                "admin_dataset",
+            )
+
+        store = get_snapshot_store()
+        st.subheader("Umur snapshot" + (" (ditulis worker precompute)" if SNAPSHOT_ONLY else ""))
+        tampilkan_tabel(
+            pd.DataFrame([
+                {'dataset': ' / '.join(str(k) for k in key[1:] if k), 'interval_detik': interval,
+                 'umur_detik': None if (umur := store.umur(key)) is None else round(umur)}
+                for key, interval in DATASET.items()
+            ]),
+            "admin_snapshot",
+        )
+
+        st.subheader("Span terakhir")
+        df_span = pd.DataFrame(perekam.daftar()[-200:][::-1])
+        df_span['waktu'] = pd.to_datetime(df_span['waktu'], unit='s')
+        tampilkan_tabel(df_span, "admin_span")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button("Unduh JSON lines", perekam.jsonl(), file_name="spans.jsonl", use_container_width=True)
+    with col2:
+        st.download_button("Unduh metrics Prometheus", perekam.prometheus(), file_name="metrics.txt", use_container_width=True)
+    with col3:
+        if st.button("Reset", use_container_width=True):
+            perekam.reset()
+            st.rerun()
+
+# --- 13. ROUTING UTAMA ---
+get_perekam()
+# Mode SNAPSHOT_ONLY: fetch & refresh dikerjakan worker precompute.py, app tidak menyentuh Google
+if not SNAPSHOT_ONLY:
+    get_warmup()
+    get_refresher()
+
+with perf.span("halaman", halaman=st.session_state.page):
+    if st.session_state.page == 'landing':
+        show_landing_page()
+
+    # Routing Teknisi
+    elif st.session_state.page == 'teknisi_menu_pilihan':
+        show_teknisi_menu_pilihan()
+    elif st.session_state.page == 'teknisi_ioan_detail':
+        show_teknisi_detail("IOAN", *KOLOM_TEKNISI["IOAN"])
+    elif st.session_state.page == 'teknisi_psb_detail':
+        show_teknisi_detail("PSB", *KOLOM_TEKNISI["PSB"]) 
+    elif st.session_state.page == 'teknisi_b2b_detail':
+        show_teknisi_detail("B2B", *KOLOM_TEKNISI["B2B"]) 
+
+    # Routing PSB
+    elif st.session_state.page == 'psb_menu_pilihan':
+        show_psb_menu_pilihan()
+
+    elif st.session_state.page == 'psb_utama':
+        show_dashboard(
+            "KPI IMBAL JASA PROVISIONING SA TANDES", TAB_NAME_PSB, MAIN_SPREADSHEET_ID, 
+            range_khusus=RANGE_PSB_KPI, kolom_kunci="ACHIEVEMENT", back_to='psb_menu'
+        )
+
+    elif st.session_state.page == 'psb_pivot_interaktif':
+        show_interactive_pivot()
+
+    # --- [UPDATE] Routing IOAN ---
+    elif st.session_state.page == 'ioan_menu_pilihan':
+        show_ioan_menu_pilihan() # Menampilkan menu pilihan
+
+    elif st.session_state.page == 'ioan':
+        # Dashboard Lama (A1:K29)
+        show_dashboard("Performansi SLA Imbal Jasa IOAN", TAB_NAME_IOAN, MAIN_SPREADSHEET_ID, range_khusus=RANGE_IOAN_SLA, kolom_kunci="SCORE", back_to='ioan_menu')
+
+    elif st.session_state.page == 'ioan_tambahan':
+        # Dashboard Kedua (M9:Q25)
+        show_dashboard("Performansi MSA-WSA IOAN", TAB_NAME_IOAN, MAIN_SPREADSHEET_ID, range_khusus=RANGE_IOAN_MSA, kolom_kunci="ACHIEVEMENT", back_to='ioan_menu')
+
+    elif st.session_state.page == 'ioan_baru_lagi':
+        # Dashboard Ketiga (T9:Y21) -> INI YANG BARU
+        show_dashboard("PI LATEN", TAB_NAME_IOAN, MAIN_SPREADSHEET_ID, range_khusus=RANGE_IOAN_LATEN, kolom_kunci="ACHIEVEMENT", back_to='ioan_menu')
+
+    # Routing B2B
+    elif st.session_state.page == 'b2b':
+        show_dashboard("Performansi B2B", TAB_NAME_B2B, MAIN_SPREADSHEET_ID, kolom_kunci="SCORE")
+
+    # Halaman admin (tidak ada di menu)
+    elif st.session_state.page == 'admin_perf' and ADMIN_KEY:
+        show_admin_perf()
 
 
 
@@ -0,0 +1,255 @@
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+import pyarrow as pa
+
+import data_prep
+import fake_sheets
+import grafik
+import konfigurasi
+import pivot_engine
+import sheets_client
+import snapshot_cache
+import styling
+
+SHEET_ID = "BENCHMARK"
+NAMA_TAB = "BANK DATA ALL 2025"
+FILE_HASIL = "benchmark_hasil.jsonl"
+UKURAN_DEFAULT = [10_000, 100_000, 1_000_000]
+# Tahap dianggap regresi kalau lebih lambat dari rasio ini dibanding run sebelumnya
+# dan selisihnya lebih dari MIN_SELISIH detik (tahap yang sangat cepat terlalu berisik)
+BATAS_REGRESI = 1.2
+MIN_SELISIH = 0.05
+
+# Pengaturan pivot yang diukur: sama seperti pilihan umum di halaman Analisa Data PS PSB
+PIVOT_ROWS = ["TEKNISI"]
+PIVOT_COLS = ["BULAN"]
+PIVOT_VALUES = "QTY"
+PIVOT_AGG = "sum"
+# Baris bertingkat untuk grafik: line lewat downsampling (titik > grafik.MAKS_TITIK) dan pie per label level pertama
+PIVOT_ROWS_BERTINGKAT = ["TEKNISI", "TANGGAL"]
+
+
+# --- TAHAP PIPELINE (URUTAN SAMA SEPERTI DI APP: AMBIL -> PARSE -> PIVOT -> TAMPIL) ---
+# Setiap tahap menerima ctx (hasil tahap sebelumnya) dan mengembalikan hasilnya sendiri.
+def tahap_ambil(ctx):
+    return ctx["pool"].fetch(SHEET_ID, NAMA_TAB, lambda ws: ws.get_all_values())
+
+
+def tahap_buat_dataframe(ctx):
+    return data_prep.buat_dataframe(ctx["ambil"])
+
+
+def tahap_infer_types(ctx):
+    return data_prep.infer_types(ctx["mentah"].copy())
+
+
+def tahap_snapshot_tulis(ctx):
+    ctx["store"].tulis((SHEET_ID, NAMA_TAB, None), ctx["buat_dataframe"])
+
+
+def tahap_snapshot_baca(ctx):
+    return ctx["store"].baca((SHEET_ID, NAMA_TAB, None))[0]
+
+
+def tahap_rollup(ctx):
+    # Cube yang sama dengan yang dibangun app untuk tab data mentah
+    daftar_dimensi = konfigurasi.ROLLUP_DIMENSI[(konfigurasi.SECOND_SPREADSHEET_ID, konfigurasi.TAB_NAME_RAW_DATA)]
+    return pivot_engine.buat_daftar_rollup(ctx["buat_dataframe"], daftar_dimensi)
+
+
+def tahap_pivot_margins(ctx):
+    df = ctx["buat_dataframe"]
+    df = df.assign(**{PIVOT_VALUES: data_prep.kolom_angka(df[PIVOT_VALUES])})
+    return pd.pivot_table(
+        df, index=PIVOT_ROWS, columns=PIVOT_COLS, values=PIVOT_VALUES, aggfunc=PIVOT_AGG,
+        fill_value=0, margins=True, margins_name="Grand Total", observed=True,
+    )
+
+
+def tahap_urutan(ctx):
+    return pivot_engine.UrutanKolom(ctx["buat_dataframe"])
+
+
+def tahap_urutkan(ctx):
+    pivot_result = ctx["pivot_margins"]
+    urutan = ctx["urutan"]
+    return pivot_result.iloc[
+        urutan.urutkan(pivot_result.index, PIVOT_ROWS),
+        urutan.urutkan(pivot_result.columns, PIVOT_COLS),
+    ]
+
+
+def tahap_pivot_rollup(ctx):
+    return pivot_engine.hitung_pivot(
+        ctx["buat_dataframe"], PIVOT_ROWS, PIVOT_COLS, PIVOT_VALUES, PIVOT_AGG,
+        rollup=ctx["rollup"], urutan=ctx["urutan"],
+    )
+
+
+def tahap_styler(ctx):
+    # Styler baru menghitung style saat dirender; _compute() adalah yang dipanggil st.dataframe
+    styler = styling.buat_styler(ctx["buat_dataframe"], "ACHIEVEMENT")
+    styler._compute()
+    return styler
+
+
+def tahap_plotly(ctx):
+    fig, _ = grafik.buat_grafik(ctx["urutkan"], "bar", PIVOT_AGG)
+    # Serialisasi JSON ikut diukur karena itu yang dikirim ke browser
+    return fig.to_json()
+
+
+def tahap_plotly_bertingkat(ctx):
+    pivot_result = pivot_engine.hitung_pivot(
+        ctx["buat_dataframe"], PIVOT_ROWS_BERTINGKAT, [], PIVOT_VALUES, PIVOT_AGG, urutan=ctx["urutan"],
+    )
+    hasil = []
+    for jenis in ("line", "pie"):
+        fig, pesan = grafik.buat_grafik(pivot_result, jenis, PIVOT_AGG)
+        if fig is None:
+            raise RuntimeError(f"Grafik {jenis} dengan baris bertingkat gagal dibuat: {pesan}")
+        hasil.append(fig.to_json())
+    return hasil
+
+
+TAHAP = [
+    ("ambil", tahap_ambil),
+    ("buat_dataframe", tahap_buat_dataframe),
+    ("infer_types", tahap_infer_types),
+    ("snapshot_tulis", tahap_snapshot_tulis),
+    ("snapshot_baca", tahap_snapshot_baca),
+    ("rollup", tahap_rollup),
+    ("pivot_margins", tahap_pivot_margins),
+    ("urutan", tahap_urutan),
+    ("urutkan", tahap_urutkan),
+    ("pivot_rollup", tahap_pivot_rollup),
+    ("styler", tahap_styler),
+    ("plotly", tahap_plotly),
+    ("plotly_bertingkat", tahap_plotly_bertingkat),
+]
+
+
+def ukur(fungsi, ctx, memori):
+    gc.collect()
+    if not memori:
+        mulai = time.perf_counter()
+        hasil = fungsi(ctx)
+        return hasil, time.perf_counter() - mulai, None
+
+    # tracemalloc tidak melihat buffer Arrow (snapshot feather, kolom string pyarrow), jadi
+    # tambahan memori di memory pool pyarrow selama tahap ini ikut dijumlahkan
+    arrow_awal = pa.total_allocated_bytes()
+    tracemalloc.start()
+    try:
+        hasil = fungsi(ctx)
+        _, puncak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    puncak += max(0, pa.total_allocated_bytes() - arrow_awal)
+    return hasil, None, puncak / 2**20
+
+
+def jalankan(jumlah_baris, memori=True, ulang=1, seed=0):
+    client = fake_sheets.FakeClient({SHEET_ID: {NAMA_TAB: fake_sheets.buat_data_psb(jumlah_baris, seed=seed)}})
+    pool = sheets_client.SheetsPool(lambda: None, authorize=client.authorize)
+
+    hasil = []
+    with tempfile.TemporaryDirectory() as folder:
+        ctx = {"pool": pool, "store": snapshot_cache.SnapshotStore(folder)}
+        for nama, fungsi in TAHAP:
+            # Waktu diukur tanpa tracemalloc (overhead-nya besar), memori diukur di run terpisah
+            keluaran, detik = None, None
+            for _ in range(ulang):
+                keluaran, d, _ = ukur(fungsi, ctx, memori=False)
+                detik = d if detik is None else min(detik, d)
+            puncak_mb = ukur(fungsi, ctx, memori=True)[2] if memori else None
+
+            ctx[nama] = keluaran
+            if nama == "ambil":
+                ctx["mentah"] = pd.DataFrame(keluaran[1:], columns=data_prep.rapikan_header(keluaran[0]))
+            hasil.append({"baris": jumlah_baris, "tahap": nama, "detik": round(detik, 4),
+                          "puncak_mb": None if puncak_mb is None else round(puncak_mb, 1)})
+            print(f"{jumlah_baris:>9,} {nama:<16} {detik:9.3f} s"
+                  + ("" if puncak_mb is None else f" {puncak_mb:9.1f} MB"), flush=True)
+    return hasil
+
+
+def info_run():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "waktu": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+    }
+
+
+# --- PENYIMPANAN HASIL & PERBANDINGAN DENGAN RUN SEBELUMNYA ---
+def baca_hasil(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(baris) for baris in f if baris.strip()]
+
+
+def simpan_hasil(path, hasil):
+    with open(path, "a", encoding="utf-8") as f:
+        for h in hasil:
+            f.write(json.dumps(h) + "\n")
+
+
+def bandingkan(lama, baru):
+    # Pembanding = hasil terakhir untuk (baris, tahap) yang sama dari run sebelumnya
+    terakhir = {(h["baris"], h["tahap"]): h for h in lama}
+    regresi = []
+    for h in baru:
+        sebelum = terakhir.get((h["baris"], h["tahap"]))
+        if not sebelum or not sebelum["detik"]:
+            continue
+        rasio = h["detik"] / sebelum["detik"]
+        tanda = "  REGRESI" if rasio > BATAS_REGRESI and h["detik"] - sebelum["detik"] > MIN_SELISIH else ""
+        print(f"{h['baris']:>9,} {h['tahap']:<16} {sebelum['detik']:9.3f} -> {h['detik']:9.3f} s "
+              f"(x{rasio:.2f}, sebelumnya commit {sebelum.get('commit')}){tanda}")
+        if tanda:
+            regresi.append(h)
+    return regresi
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline data dashboard dengan data PSB sintetis.")
+    parser.add_argument("--baris", type=int, nargs="+", default=UKURAN_DEFAULT, help="jumlah baris data sintetis")
+    parser.add_argument("--ulang", type=int, default=1, help="ulangi tiap tahap, ambil waktu tercepat")
+    parser.add_argument("--tanpa-memori", action="store_true", help="lewati pengukuran puncak memori")
+    parser.add_argument("--hasil", default=FILE_HASIL, help="file JSON lines untuk menyimpan hasil")
+    parser.add_argument("--tidak-simpan", action="store_true", help="jangan tambahkan hasil ke file")
+    args = parser.parse_args()
+
+    info = info_run()
+    hasil = []
+    for jumlah_baris in args.baris:
+        for h in jalankan(jumlah_baris, memori=not args.tanpa_memori, ulang=args.ulang):
+            hasil.append({**info, **h})
+
+    print("\nPerbandingan dengan run sebelumnya:")
+    regresi = bandingkan(baca_hasil(args.hasil), hasil)
+    if not args.tidak_simpan:
+        simpan_hasil(args.hasil, hasil)
+    return 1 if regresi else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,175 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+BULAN_ID = {
+    'JANUARI': 1, 'JAN': 1, 'FEBRUARI': 2, 'FEB': 2, 'MARET': 3, 'MAR': 3, 'APRIL': 4, 'APR': 4,
+    'MEI': 5, 'MAY': 5, 'JUNI': 6, 'JUN': 6, 'JULI': 7, 'JUL': 7, 'AGUSTUS': 8, 'AGT': 8, 'AGU': 8,
+    'SEPTEMBER': 9, 'SEP': 9, 'OKTOBER': 10, 'OKT': 10, 'NOVEMBER': 11, 'NOV': 11, 'DESEMBER': 12, 'DES': 12,
+}
+
+# Angka dengan nol di depan ("0812...", NIK) sengaja tidak cocok -> tetap teks
+POLA_INT = r"-?(?:0|[1-9]\d*)"
+POLA_ANGKA = r"-?(?:0|[1-9]\d*)(?:[.,]\d+)?"
+# "1.234" di data Indonesia = seribu dua ratus tiga puluh empat (titik pemisah ribuan), bukan 1,234.
+# Kolom yang punya nilai seperti ini tidak dijadikan angka (tetap teks, seperti sebelumnya).
+POLA_RIBUAN = r"-?\d{1,3}(?:\.\d{3})+"
+# Bilangan bulat lebih dari 18 digit tidak muat di int64 (nomor ID panjang) -> tetap teks
+MAKS_DIGIT_INT = 18
+POLA_PERSEN = r"-?\d+(?:[.,]\d+)?\s?%"
+POLA_TANGGAL = r"\d{1,2}[/-]\d{1,2}[/-]\d{4}(?:\s+\d{1,2}:\d{2}(?::\d{2})?)?"
+POLA_TANGGAL_BULAN = r"(\d{1,2})[\s-]+([A-Za-z]+)[\s-]+(\d{4})"
+
+# Kolom teks dijadikan category kalau nilai uniknya paling banyak separuh jumlah baris
+MIN_BARIS_CATEGORY = 50
+RASIO_CATEGORY = 0.5
+
+
+# --- MEMBUAT DATAFRAME DARI HASIL GOOGLE SHEET ---
+def rapikan_header(headers):
+    # Header dobel diberi akhiran _1, _2, ... (dibuang lagi saat ditampilkan)
+    seen = {}
+    new_headers = []
+    for h in headers:
+        h = str(h).strip()
+        if h in seen:
+            seen[h] += 1
+            new_headers.append(f"{h}_{seen[h]}")
+        else:
+            seen[h] = 0
+            new_headers.append(h)
+    return new_headers
+
+
+def buat_dataframe(data):
+    if len(data) > 0:
+        data = ratakan_lebar(data)
+        df = infer_types(pd.DataFrame(data[1:], columns=rapikan_header(data[0])))
+        df.attrs['versi'] = hitung_versi(df)
+        return df
+    else:
+        return pd.DataFrame()
+
+
+# Baris baru dari DeltaSync ditambahkan ke frame yang sudah bertipe, tanpa membangun ulang frame.
+# Tiap kolom baru diubah ke tipe kolom lama; kalau tidak cocok (misalnya sel kosong di kolom angka,
+# yang pada deteksi ulang membuat kolom itu jadi teks) hasilnya None -> pemanggil bangun ulang penuh.
+def tambah_baris(df, rows):
+    df = df.copy(deep=False)
+    mentah = pd.DataFrame(rows, columns=df.columns, dtype=object)
+    baru = infer_types(mentah.copy())
+    for col in df.columns:
+        lama, seri = df[col], baru[col]
+        if isinstance(lama.dtype, pd.CategoricalDtype):
+            teks = mentah[col]
+            tambahan = pd.Index(teks.unique()).difference(lama.cat.categories)
+            if len(tambahan):
+                df[col] = lama = lama.cat.add_categories(tambahan)
+            baru[col] = pd.Categorical(teks, categories=lama.cat.categories)
+        elif pd.api.types.is_integer_dtype(lama.dtype) or pd.api.types.is_float_dtype(lama.dtype):
+            if not pd.api.types.is_numeric_dtype(seri.dtype):
+                return None
+            if pd.api.types.is_integer_dtype(lama.dtype) and not pd.api.types.is_integer_dtype(seri.dtype):
+                return None
+            baru[col] = seri.astype(lama.dtype)
+        elif pd.api.types.is_datetime64_any_dtype(lama.dtype):
+            if not pd.api.types.is_datetime64_any_dtype(seri.dtype):
+                return None
+            baru[col] = seri.astype(lama.dtype)
+        else:
+            baru[col] = mentah[col].astype(lama.dtype)
+    hasil = pd.concat([df, baru], ignore_index=True)
+    hasil.attrs['versi'] = hitung_versi(hasil)
+    return hasil
+
+
+# Hasil range (get()) tidak rata: API membuang sel kosong di ujung kanan, jadi header pun bisa
+# lebih pendek dari baris data. Semua baris (termasuk header) dipadding ke baris terlebar.
+def ratakan_lebar(data):
+    lebar = max(len(row) for row in data)
+    if all(len(row) == lebar for row in data):
+        return data
+    return [list(row) + [""] * (lebar - len(row)) for row in data]
+
+
+# Buang baris yang kolom pertamanya (kolom kunci) kosong, sebelum dijadikan DataFrame.
+def saring_kunci_kosong(data):
+    if len(data) == 0:
+        return data
+    data = ratakan_lebar(data)
+    return [data[0]] + [row for row in data[1:] if str(row[0]).strip() != ""]
+
+
+# Versi = hash isi data. Ikut tersimpan di df.attrs (dan di snapshot), dipakai sebagai kunci cache turunan.
+def hitung_versi(df):
+    h = hashlib.sha1(repr([(c, str(t)) for c, t in df.dtypes.items()]).encode('utf-8'))
+    if len(df):
+        h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()[:16]
+
+
+def _semua_cocok(teks, pola):
+    return bool(teks.str.fullmatch(pola).all())
+
+
+def _ke_angka(teks, errors='raise'):
+    teks = teks.str.replace('%', '', regex=False).str.strip().str.replace(',', '.', regex=False)
+    return pd.to_numeric(teks, errors=errors)
+
+
+# Kolom nilai pivot yang masih teks (mis. desimal koma dengan satu sel kosong) -> angka; yang tidak bisa -> 0
+def kolom_angka(seri):
+    if pd.api.types.is_numeric_dtype(seri.dtype):
+        return seri.fillna(0)
+    return _ke_angka(seri.astype(str), errors='coerce').fillna(0)
+
+
+def _ke_tanggal(teks):
+    if _semua_cocok(teks, POLA_TANGGAL):
+        return pd.to_datetime(teks.str.replace('-', '/', regex=False), dayfirst=True, format='mixed', errors='coerce')
+    if _semua_cocok(teks, POLA_TANGGAL_BULAN):
+        bagian = teks.str.extract(POLA_TANGGAL_BULAN)
+        bulan = bagian[1].str.upper().map(BULAN_ID)
+        if bulan.isna().any():
+            return None
+        return pd.to_datetime(
+            pd.DataFrame({'year': bagian[2].astype(int), 'month': bulan.astype(int), 'day': bagian[0].astype(int)}),
+            errors='coerce',
+        )
+    return None
+
+
+# --- DETEKSI TIPE KOLOM (SEKALI SAAT DATA MASUK, HASILNYA IKUT DISIMPAN DI CACHE/SNAPSHOT) ---
+# Pola dicek pada nilai unik saja (hasil factorize), lalu dipetakan balik lewat kode.
+# Kolom hanya diubah kalau SEMUA selnya cocok; kolom yang ada sel kosong tetap teks
+# (sama seperti aturan isnumeric().all() sebelumnya, supaya hitungan pivot tidak berubah).
+def infer_types(df):
+    for col in df.columns:
+        seri = df[col]
+        if not (seri.dtype == object or pd.api.types.is_string_dtype(seri)):
+            continue
+        codes, uniques = pd.factorize(seri)
+        teks = pd.Index(uniques.astype(str)).str.strip()
+        hasil = None
+
+        if len(teks) and not (codes == -1).any() and not (teks == '').any():
+            if _semua_cocok(teks, POLA_INT):
+                if teks.str.lstrip('-').str.len().max() <= MAKS_DIGIT_INT:
+                    hasil = _ke_angka(teks).astype('int64')
+            elif _semua_cocok(teks, POLA_ANGKA) and not teks.str.fullmatch(POLA_RIBUAN).any():
+                # Desimal koma ("95,5") maupun titik
+                hasil = _ke_angka(teks).astype('float64')
+            elif _semua_cocok(teks, POLA_PERSEN):
+                # "95,5%" -> 95.5 (bukan 0.955), supaya bisa dibandingkan langsung dengan target 100
+                hasil = _ke_angka(teks).astype('float64')
+            else:
+                tanggal = _ke_tanggal(teks)
+                if tanggal is not None and not tanggal.isna().any():
+                    hasil = tanggal
+
+        if hasil is not None:
+            df[col] = np.asarray(hasil).take(codes)
+        elif len(seri) >= MIN_BARIS_CATEGORY and len(uniques) <= len(seri) * RASIO_CATEGORY:
+            df[col] = pd.Categorical.from_codes(codes, categories=uniques)
+    return df
@@ -0,0 +1,53 @@
+import re
+import threading
+
+import pandas as pd
+
+
+# --- DATASET BERSAMA: SATU FRAME PER VERSI DATA UNTUK SEMUA SESSION ---
+# Frame disimpan sekali per proses (kolom angka dari snapshot menunjuk langsung ke file feather
+# yang di-memory-map, teks dalam buffer Arrow). Halaman hanya menerima view: pandas >= 3 selalu
+# copy-on-write, jadi perubahan di view menyalin kolom yang diubah saja, frame bersama tidak ikut berubah.
+class DatasetBersama:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def bagikan(self, key, df):
+        # Versi sama dengan yang sudah ada -> pakai frame lama, supaya cache turunan (per versi)
+        # dan semua session tetap menunjuk ke satu salinan data
+        versi = df.attrs.get('versi')
+        with self._lock:
+            lama = self._data.get(key)
+            if lama is not None and versi is not None and lama.attrs.get('versi') == versi:
+                return lama
+            df = bekukan(df)
+            self._data[key] = df
+            return df
+
+    def daftar(self):
+        with self._lock:
+            return dict(self._data)
+
+
+# Kolom teks yang masih berupa objek Python dipindah ke string Arrow (satu buffer per kolom)
+def bekukan(df):
+    teks = [c for c in df.columns if df[c].dtype == object and pd.api.types.infer_dtype(df[c]) in ('string', 'empty')]
+    if teks:
+        df = df.astype({c: pd.StringDtype('pyarrow', na_value=float('nan')) for c in teks})
+    return df
+
+
+def view(df):
+    # Objek frame baru, data tetap milik frame bersama sampai ada kolom yang diubah
+    return df.copy(deep=False)
+
+
+# Nama tampilan tanpa akhiran _1, _2 dari header dobel; hanya label, frame-nya tidak disalin
+def label_kolom(columns):
+    hasil = {}
+    for col in columns:
+        bersih = re.sub(r'_\d+$', '', str(col))
+        if bersih != col:
+            hasil[col] = bersih
+    return hasil
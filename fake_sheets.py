@@ -0,0 +1,143 @@
+import json
+import random
+import threading
+import time
+
+import gspread
+from gspread.utils import a1_range_to_grid_range
+
+
+# --- BACKEND GSPREAD PALSU (UNTUK UKUR LATENCY & JUMLAH REQUEST TANPA INTERNET) ---
+# Isi data: {sheet_id: {nama_tab: [[baris header], [baris data], ...]}}
+class FakeClient:
+    def __init__(self, tables, latency=0.0):
+        self.tables = tables
+        self.latency = latency
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_json(cls, path, latency=0.0):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), latency=latency)
+
+    def round_trip(self, jenis):
+        with self._lock:
+            self.calls[jenis] = self.calls.get(jenis, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def total_calls(self):
+        with self._lock:
+            return sum(self.calls.values())
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls.clear()
+
+    def authorize(self, creds=None):
+        # Meniru pertukaran token OAuth yang terjadi setiap client baru dibuat
+        self.round_trip("auth")
+        return self
+
+    def open_by_key(self, key):
+        self.round_trip("open")
+        if key not in self.tables:
+            raise gspread.exceptions.SpreadsheetNotFound(key)
+        return FakeSpreadsheet(self, key)
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, key):
+        self.client = client
+        self.id = key
+
+    def worksheet(self, title):
+        self.client.round_trip("metadata")
+        if title not in self.client.tables[self.id]:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return FakeWorksheet(self.client, self.id, title)
+
+    def values_batch_get(self, ranges, params=None):
+        self.client.round_trip("values")
+        value_ranges = []
+        for nama_range in ranges:
+            title, range_cell = nama_range.rsplit("!", 1)
+            title = title.strip("'").replace("''", "'")
+            rows = potong_range(self.client.tables[self.id][title], range_cell)
+            value_ranges.append({"range": nama_range, "values": rows} if rows else {"range": nama_range})
+        return {"spreadsheetId": self.id, "valueRanges": value_ranges}
+
+
+def potong_range(rows, range_cell):
+    grid = a1_range_to_grid_range(range_cell)
+    r0 = grid.get("startRowIndex", 0)
+    r1 = grid.get("endRowIndex", len(rows))
+    c0 = grid.get("startColumnIndex", 0)
+    c1 = grid.get("endColumnIndex")
+    hasil = []
+    for row in rows[r0:r1]:
+        cells = list(row[c0:c1])
+        # API Sheets membuang sel kosong di ujung kanan baris
+        while cells and cells[-1] == "":
+            cells.pop()
+        hasil.append(cells)
+    while hasil and not hasil[-1]:
+        hasil.pop()
+    return hasil
+
+
+class FakeWorksheet:
+    def __init__(self, client, key, title):
+        self.client = client
+        self.spreadsheet_id = key
+        self.title = title
+
+    @property
+    def _rows(self):
+        return self.client.tables[self.spreadsheet_id][self.title]
+
+    def get(self, range_cell):
+        self.client.round_trip("values")
+        return potong_range(self._rows, range_cell)
+
+    def get_all_values(self):
+        self.client.round_trip("values")
+        lebar = max((len(r) for r in self._rows), default=0)
+        return [list(r) + [""] * (lebar - len(r)) for r in self._rows]
+
+
+# --- GENERATOR DATA MENTAH PSB (MIRIP TAB BANK DATA ALL 2025) ---
+# Tanggal dd/mm/yyyy dan "5 Maret 2025", nama bulan Indonesia, angka desimal koma,
+# persen, header dobel (STATUS), dan beberapa sel kosong seperti data asli.
+NAMA_BULAN = ["JANUARI", "FEBRUARI", "MARET", "APRIL", "MEI", "JUNI",
+              "JULI", "AGUSTUS", "SEPTEMBER", "OKTOBER", "NOVEMBER", "DESEMBER"]
+HEADER_PSB = ["TANGGAL", "BULAN", "TGL VALIDASI", "STO", "TEKNISI", "JENIS ORDER",
+              "STATUS", "QTY", "NILAI", "ACHIEVEMENT", "STATUS", "KETERANGAN"]
+
+
+def buat_data_psb(jumlah_baris, seed=0, jumlah_teknisi=300):
+    acak = random.Random(seed)
+    sto = [f"STO{i:02d}" for i in range(25)]
+    teknisi = [f"TEKNISI {i:03d}" for i in range(jumlah_teknisi)]
+    jenis = ["AO", "MO", "PDA", "SO", "DO"]
+    status = ["PS", "CANCEL", "FALLOUT", "KENDALA"]
+    rows = [list(HEADER_PSB)]
+    for _ in range(jumlah_baris):
+        bulan = acak.randint(1, 12)
+        hari = acak.randint(1, 28)
+        rows.append([
+            f"{hari:02d}/{bulan:02d}/2025",
+            NAMA_BULAN[bulan - 1],
+            f"{hari} {NAMA_BULAN[bulan - 1].title()} 2025",
+            acak.choice(sto),
+            acak.choice(teknisi),
+            acak.choice(jenis),
+            acak.choice(status),
+            str(acak.randint(1, 5)),
+            f"{acak.randint(0, 999)},{acak.randint(0, 99):02d}",
+            f"{acak.randint(40, 130)},{acak.randint(0, 9)}%",
+            acak.choice(status),
+            "" if acak.random() < 0.7 else acak.choice(["ODP PENUH", "RNA", "PENDING"]),
+        ])
+    return rows
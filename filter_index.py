@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# Kolom dengan nilai unik lebih dari ini tidak diindeks (filter jatuh ke isin biasa)
+MAX_UNIK = 5000
+
+
+# --- INDEKS FILTER (INVERTED INDEX) PER VERSI DATA ---
+# Untuk setiap kolom ber-kardinalitas rendah: nilai -> posisi baris (array terurut).
+# Filter beberapa kolom = irisan array posisi, jadi biayanya mengikuti jumlah baris hasil,
+# bukan jumlah baris data mentah. Daftar nilai unik untuk sidebar juga sudah siap.
+class FilterIndex:
+    def __init__(self, df, max_unik=MAX_UNIK):
+        self.jumlah_baris = len(df)
+        self._kolom = {}
+        for kolom in df.columns:
+            seri = df[kolom]
+            if isinstance(seri.dtype, pd.CategoricalDtype):
+                codes = seri.cat.codes.to_numpy()
+                nilai = seri.cat.categories
+            else:
+                codes, nilai = pd.factorize(seri)
+                if len(nilai) > max_unik:
+                    continue
+            urutan = np.argsort(codes, kind='stable')
+            jumlah = np.bincount(codes[codes >= 0], minlength=len(nilai))
+            batas = np.concatenate([[0], np.cumsum(jumlah)]) + (codes < 0).sum()
+            # Urutan kemunculan di data, sama seperti Series.unique()
+            muncul = np.flatnonzero(jumlah)[np.argsort(urutan[batas[:-1][jumlah > 0]], kind='stable')]
+            self._kolom[kolom] = (pd.Index(nilai), urutan, batas, nilai[muncul].tolist())
+
+    def punya(self, kolom):
+        return kolom in self._kolom
+
+    def unik(self, kolom):
+        return self._kolom[kolom][3]
+
+    def posisi(self, kolom, nilai_terpilih):
+        nilai, urutan, batas, _ = self._kolom[kolom]
+        kode = nilai.get_indexer(list(nilai_terpilih))
+        kode = kode[kode >= 0]
+        if len(kode) == 0:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate([urutan[batas[k]:batas[k + 1]] for k in kode]))
+
+    def terapkan(self, df, daftar_filter):
+        # daftar_filter: [(kolom, nilai_terpilih), ...]; semua syarat harus terpenuhi (AND)
+        posisi = None
+        sisa = []
+        for kolom, nilai_terpilih in daftar_filter:
+            if not self.punya(kolom):
+                sisa.append((kolom, nilai_terpilih))
+                continue
+            p = self.posisi(kolom, nilai_terpilih)
+            posisi = p if posisi is None else np.intersect1d(posisi, p, assume_unique=True)
+
+        hasil = df if posisi is None else df.iloc[posisi]
+        for kolom, nilai_terpilih in sisa:
+            hasil = hasil[hasil[kolom].isin(list(nilai_terpilih))]
+        return hasil
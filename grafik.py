@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+import perf
+from pivot_engine import data_grafik
+
+# Batas jumlah "mark" supaya grafik tetap ringan di browser HP
+MAKS_SERI = 10          # warna/seri: top-N, sisanya digabung jadi "Lainnya"
+MAKS_KATEGORI = 30      # batang / potongan pie: top-N, sisanya "Lainnya"
+MAKS_TITIK = 500        # titik per garis, di atas ini setiap garis di-downsample dengan LTTB
+BATAS_TEKS = 300        # label angka di batang hanya kalau jumlah batang sedikit
+BATAS_WEBGL = 1000      # garis dengan titik lebih banyak dari ini digambar pakai WebGL
+LABEL_LAINNYA = "Lainnya"
+
+# Cara menggabungkan nilai yang masuk "Lainnya", mengikuti jenis hitungan pivot
+GABUNG = {'count': 'sum', 'sum': 'sum', 'mean': 'mean', 'min': 'min', 'max': 'max'}
+
+
+# --- TOP-N + "LAINNYA" ---
+# Yang dipertahankan = N-1 terbesar (menurut total nilai absolut), urutan aslinya tidak diubah
+def batasi_kolom(df, n, agg_func):
+    if df.shape[1] <= n:
+        return df
+    total = df.abs().sum(axis=0)
+    atas = set(total.nlargest(n - 1).index)
+    kolom = [c for c in df.columns if c in atas]
+    hasil = df[kolom].copy()
+    hasil[LABEL_LAINNYA] = df.drop(columns=kolom).agg(GABUNG.get(agg_func, 'sum'), axis=1)
+    return hasil
+
+
+def batasi_baris(df, n, agg_func):
+    return batasi_kolom(df.T, n, agg_func).T
+
+
+# --- DOWNSAMPLING LTTB (LARGEST-TRIANGLE-THREE-BUCKETS) ---
+# Hasil: posisi titik yang dipertahankan; titik pertama & terakhir selalu ikut,
+# dari setiap bucket dipilih titik yang membentuk segitiga terbesar (puncak & lembah tetap terlihat).
+def lttb(y, n_keluar):
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_keluar >= n or n_keluar < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=float)
+    batas = np.linspace(1, n - 1, n_keluar - 1).astype(int)
+    hasil = [0]
+    a = 0
+    for i in range(n_keluar - 2):
+        awal, akhir = batas[i], batas[i + 1]
+        awal_berikut = batas[i + 1]
+        akhir_berikut = batas[i + 2] if i + 2 < len(batas) else n
+        rata_x = x[awal_berikut:akhir_berikut].mean()
+        rata_y = y[awal_berikut:akhir_berikut].mean()
+        luas = np.abs((x[a] - rata_x) * (y[awal:akhir] - y[a]) - (x[a] - x[awal:akhir]) * (rata_y - y[a]))
+        a = awal + int(np.argmax(luas))
+        hasil.append(a)
+    hasil.append(n - 1)
+    return np.array(hasil)
+
+
+def downsample_seri(chart_df, n_keluar):
+    # Setiap seri di-downsample sendiri -> format panjang (x, Kategori, Jumlah) seperti hasil melt
+    x_axis_name = chart_df.index.name or 'index'
+    bagian = []
+    for i, kolom in enumerate(chart_df.columns):
+        seri = chart_df.iloc[:, i]
+        posisi = lttb(seri.fillna(0), n_keluar)
+        bagian.append(pd.DataFrame({x_axis_name: chart_df.index[posisi], 'Kategori': kolom, 'Jumlah': seri.to_numpy()[posisi]}))
+    return pd.concat(bagian, ignore_index=True)
+
+
+# --- GRAFIK DARI HASIL PIVOT ---
+# jenis: 'bar', 'line', atau 'pie'. Hasil: (fig, pesan); fig None kalau grafik tidak bisa dibuat.
+def buat_grafik(pivot_result, jenis, agg_func='sum'):
+    px = perf.impor("plotly.express")
+    chart_df, _ = data_grafik(pivot_result)
+    if chart_df.empty:
+        return None, "Data tidak cukup untuk membuat grafik."
+
+    # Baris bertingkat diringkas ke level pertama (digabung seperti "Lainnya"), supaya bar, line,
+    # dan pie memakai sumbu-x yang sama dan level berikutnya tidak ikut jadi seri saat melt
+    if chart_df.index.nlevels > 1:
+        chart_df = chart_df.groupby(level=0, sort=False, observed=True).agg(GABUNG.get(agg_func, 'sum'))
+
+    if jenis == 'pie':
+        if len(chart_df.columns) != 1:
+            return None, "⚠️ Pie Chart hanya untuk data 1 kolom."
+        # Nilai = satu-satunya kolom pivot; label = baris
+        data = batasi_baris(chart_df, MAKS_KATEGORI, agg_func)
+        x_axis_name, y_axis_name = chart_df.index.name or 'index', chart_df.columns[0]
+        chart_data_clean = pd.DataFrame({x_axis_name: data.index, y_axis_name: data.iloc[:, 0].to_numpy()})
+        return px.pie(chart_data_clean, names=x_axis_name, values=y_axis_name, hole=0.4), None
+
+    chart_df = batasi_kolom(chart_df, MAKS_SERI, agg_func)
+    if jenis == 'bar':
+        chart_df = batasi_baris(chart_df, MAKS_KATEGORI, agg_func)
+
+    chart_data_clean = chart_df.reset_index()
+    x_axis_name = chart_data_clean.columns[0]
+    if jenis == 'line' and len(chart_df) > MAKS_TITIK:
+        # Urutan sumbu-x dikunci, karena tiap seri bisa menyisakan titik yang berbeda
+        x = chart_df.index
+        data = downsample_seri(chart_df.rename_axis(x_axis_name), MAKS_TITIK)
+        opsi = {'y': 'Jumlah', 'color': 'Kategori', 'category_orders': {x_axis_name: list(pd.unique(x))}}
+    elif len(chart_df.columns) == 1:
+        y_axis_name = chart_df.columns[0]
+        data, opsi = chart_data_clean, {'y': y_axis_name}
+    else:
+        data = chart_data_clean.melt(id_vars=x_axis_name, var_name='Kategori', value_name='Jumlah')
+        opsi = {'y': 'Jumlah', 'color': 'Kategori'}
+
+    if jenis == 'bar':
+        if len(chart_df.columns) == 1:
+            opsi['color'] = y_axis_name
+        else:
+            opsi['barmode'] = 'group'
+        return px.bar(data, x=x_axis_name, text_auto=len(data) <= BATAS_TEKS, **opsi), None
+
+    banyak = len(data) > BATAS_WEBGL
+    return px.line(data, x=x_axis_name, markers=not banyak, render_mode='webgl' if banyak else 'auto', **opsi), None
@@ -0,0 +1,84 @@
+import os
+
+import sheets_client
+
+# ==========================================
+#  KONFIGURASI GOOGLE SHEET
+#  Dipakai app3.py (routing halaman) dan precompute.py (worker), jadi keduanya membaca daftar yang sama.
+# ==========================================
+
+MAIN_SPREADSHEET_ID = "1mSHW1FQG19MTRD6nbqFdrP_6klm_uUD-XhWIHEaup_o"
+SECOND_SPREADSHEET_ID = "19l9TLgZb8kjNnq3wbxG2U5slNphOQhNbBy4KK3zoXnA" 
+
+TAB_NAME_TEKNISI = "ALL TEKNISI TNS"
+TAB_NAME_IOAN    = "CEK IOAN"
+TAB_NAME_PSB     = "CEK PSB"
+TAB_NAME_B2B     = "Data B2B"
+TAB_NAME_RAW_DATA = "BANK DATA ALL 2025" 
+
+CACHE_TTL = 60  # detik
+
+RANGE_IOAN_SLA    = "A1:K29"
+RANGE_IOAN_MSA    = "M9:Q25"
+RANGE_IOAN_LATEN  = "T9:Y21"
+RANGE_PSB_KPI     = "A7:F15"
+
+# Range yang diambil sekaligus dalam SATU request batch per spreadsheet.
+# Membuka salah satu dashboard ini otomatis mengisi cache dashboard lainnya.
+RANGE_BATCH = {
+    MAIN_SPREADSHEET_ID: (
+        (TAB_NAME_IOAN, RANGE_IOAN_SLA),
+        (TAB_NAME_IOAN, RANGE_IOAN_MSA),
+        (TAB_NAME_IOAN, RANGE_IOAN_LATEN),
+        (TAB_NAME_PSB, RANGE_PSB_KPI),
+    ),
+}
+
+# Cube rollup (pra-agregasi) per tab, dibangun setiap data di-refresh: satu cube per daftar dimensi.
+# Dimensi sengaja dipisah per cube supaya tiap cube jauh lebih kecil dari data mentah;
+# pivot dijawab dari cube terkecil yang memuat semua baris/kolom/filternya.
+ROLLUP_DIMENSI = {
+    (SECOND_SPREADSHEET_ID, TAB_NAME_RAW_DATA): (
+        ("BULAN", "TEKNISI", "STATUS"),
+        ("TANGGAL", "BULAN", "STATUS"),
+        ("BULAN", "STO", "STATUS", "JENIS ORDER"),
+    ),
+}
+
+# Tab yang datanya hanya bertambah di bawah: diambil bertahap (baris baru saja), bukan full reload.
+TAB_DELTA_SYNC = {
+    (SECOND_SPREADSHEET_ID, TAB_NAME_RAW_DATA),
+}
+
+# Potongan kolom tab teknisi per halaman (iloc[:, awal:akhir]); tiap potongan diambil
+# sebagai range A1 sendiri ("A:C", "D:F", "G:I"), jadi halaman hanya mengunduh kolomnya.
+KOLOM_TEKNISI = {"B2B": (0, 3), "IOAN": (3, 6), "PSB": (6, 9)}
+
+# Tab yang baris dengan kolom kunci (kolom pertama range) kosong dibuang saat data masuk
+TAB_KUNCI_WAJIB_ISI = {
+    (MAIN_SPREADSHEET_ID, TAB_NAME_TEKNISI),
+}
+
+# Semua dataset yang dipakai dashboard -> interval refresh background (detik).
+# Refresher menjaga snapshot tetap segar, jadi halaman hampir tidak pernah menunggu Google.
+REFRESH_INTERVAL = int(os.environ.get("REFRESH_INTERVAL", CACHE_TTL))
+DATASET = {
+    **{
+        (MAIN_SPREADSHEET_ID, TAB_NAME_TEKNISI, sheets_client.range_kolom(awal, akhir)): REFRESH_INTERVAL
+        for awal, akhir in KOLOM_TEKNISI.values()
+    },
+    (MAIN_SPREADSHEET_ID, TAB_NAME_PSB, RANGE_PSB_KPI): REFRESH_INTERVAL,
+    (MAIN_SPREADSHEET_ID, TAB_NAME_IOAN, RANGE_IOAN_SLA): REFRESH_INTERVAL,
+    (MAIN_SPREADSHEET_ID, TAB_NAME_IOAN, RANGE_IOAN_MSA): REFRESH_INTERVAL,
+    (MAIN_SPREADSHEET_ID, TAB_NAME_IOAN, RANGE_IOAN_LATEN): REFRESH_INTERVAL,
+    (MAIN_SPREADSHEET_ID, TAB_NAME_B2B, None): REFRESH_INTERVAL,
+    (SECOND_SPREADSHEET_ID, TAB_NAME_RAW_DATA, None): REFRESH_INTERVAL * 5,
+}
+
+# Folder snapshot (feather) yang dibaca app dan ditulis refresher/worker. Beberapa replika app
+# bisa berbagi satu folder; file ditulis atomik (tmp + rename), jadi pembaca tidak pernah melihat file setengah jadi.
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", ".snapshot_cache")
+
+# SNAPSHOT_ONLY=1: app tidak pernah mengambil data ke Google sendiri (tanpa warm-up & refresher),
+# hanya membaca snapshot yang ditulis worker precompute.py.
+SNAPSHOT_ONLY = os.environ.get("SNAPSHOT_ONLY", "") not in ("", "0")
@@ -0,0 +1,199 @@
+import collections
+import importlib
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Jumlah span terakhir yang disimpan di memori (untuk halaman admin & metrics)
+MAX_SPAN = 5000
+KUANTIL = (0.5, 0.95)
+
+_lokal = threading.local()
+
+# Lama import modul berat (ms) yang dimuat lewat impor(), untuk halaman admin
+WAKTU_IMPOR = {}
+
+
+# --- PEREKAM SPAN (SATU PER PROSES, DIPAKAI SEMUA SESSION & THREAD BACKGROUND) ---
+class Perekam:
+    def __init__(self, maks=MAX_SPAN):
+        self._lock = threading.Lock()
+        self._span = collections.deque(maxlen=maks)
+        # Total kumulatif per (halaman, tahap) untuk Prometheus: tidak ikut terbuang dari ring buffer
+        # dan tidak ikut di-reset, supaya counter _count/_sum/cache_total selalu naik
+        self._total = collections.defaultdict(lambda: {"n": 0, "total_ms": 0.0, "hit": 0, "miss": 0, "error": 0})
+        self.file_log = None
+
+    def catat(self, data):
+        with self._lock:
+            self._span.append(data)
+            total = self._total[(data["halaman"], data["nama"])]
+            total["n"] += 1
+            total["total_ms"] += data["durasi_ms"]
+            if data.get("cache") in ("hit", "miss"):
+                total[data["cache"]] += 1
+            total["error"] += bool(data.get("error"))
+            if self.file_log:
+                with open(self.file_log, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(data, default=str) + "\n")
+
+    def daftar(self):
+        with self._lock:
+            return list(self._span)
+
+    def reset(self):
+        # Hanya span terakhir (halaman admin & kuantil); total kumulatif tetap
+        with self._lock:
+            self._span.clear()
+
+    def kumulatif(self):
+        with self._lock:
+            return {kunci: dict(total) for kunci, total in sorted(self._total.items())}
+
+    def jsonl(self):
+        return "".join(json.dumps(s, default=str) + "\n" for s in self.daftar())
+
+    def ringkasan(self):
+        # {(halaman, tahap): {"n", "p50_ms", "p95_ms", "max_ms", "total_ms", "hit", "miss", "error"}}
+        grup = collections.defaultdict(list)
+        for s in self.daftar():
+            grup[(s["halaman"], s["nama"])].append(s)
+
+        hasil = {}
+        for kunci, daftar in sorted(grup.items()):
+            durasi = np.array([s["durasi_ms"] for s in daftar])
+            p50, p95 = np.quantile(durasi, KUANTIL)
+            hasil[kunci] = {
+                "n": len(daftar),
+                "p50_ms": round(float(p50), 2),
+                "p95_ms": round(float(p95), 2),
+                "max_ms": round(float(durasi.max()), 2),
+                "total_ms": round(float(durasi.sum()), 2),
+                "hit": sum(s.get("cache") == "hit" for s in daftar),
+                "miss": sum(s.get("cache") == "miss" for s in daftar),
+                "error": sum(bool(s.get("error")) for s in daftar),
+            }
+        return hasil
+
+    def prometheus(self):
+        baris = [
+            "# HELP dashboard_span_seconds Durasi tahap per halaman dashboard.",
+            "# TYPE dashboard_span_seconds summary",
+        ]
+        # Kuantil dari span terakhir di ring buffer; _sum, _count & counter cache dari total kumulatif
+        ringkasan = self.ringkasan()
+        kumulatif = self.kumulatif()
+        for (halaman, tahap), total in kumulatif.items():
+            label = f'halaman="{_escape(halaman)}",tahap="{_escape(tahap)}"'
+            r = ringkasan.get((halaman, tahap))
+            if r:
+                for q, kolom in zip(KUANTIL, ("p50_ms", "p95_ms")):
+                    baris.append(f'dashboard_span_seconds{{{label},quantile="{q}"}} {r[kolom] / 1000:.6f}')
+            baris.append(f"dashboard_span_seconds_sum{{{label}}} {total['total_ms'] / 1000:.6f}")
+            baris.append(f"dashboard_span_seconds_count{{{label}}} {total['n']}")
+
+        baris += [
+            "# HELP dashboard_cache_total Jumlah cache hit/miss per tahap.",
+            "# TYPE dashboard_cache_total counter",
+        ]
+        for (halaman, tahap), r in kumulatif.items():
+            for hasil in ("hit", "miss"):
+                if r[hasil]:
+                    baris.append(
+                        f'dashboard_cache_total{{halaman="{_escape(halaman)}",tahap="{_escape(tahap)}",'
+                        f'hasil="{hasil}"}} {r[hasil]}'
+                    )
+        return "\n".join(baris) + "\n"
+
+
+def _escape(teks):
+    return str(teks).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+PEREKAM = Perekam()
+
+
+def _stack():
+    if not hasattr(_lokal, "stack"):
+        _lokal.stack = []
+    return _lokal.stack
+
+
+# --- SPAN: UKUR DURASI SATU TAHAP ---
+# Dipakai sebagai `with perf.span("pivot") as s: ...; s["baris"] = len(hasil)`.
+# Halaman diwarisi dari span induk; span di thread background tercatat sebagai "background".
+@contextmanager
+def span(nama, **atribut):
+    stack = _stack()
+    induk = stack[-1] if stack else None
+    data = {"nama": nama, "halaman": induk["halaman"] if induk else "background"}
+    data.update(atribut)
+    stack.append(data)
+    mulai = time.perf_counter()
+    try:
+        yield data
+    except Exception as e:
+        data["error"] = type(e).__name__
+        raise
+    finally:
+        data["durasi_ms"] = round((time.perf_counter() - mulai) * 1000, 3)
+        data["waktu"] = time.time()
+        stack.pop()
+        PEREKAM.catat(data)
+
+
+def tandai(**atribut):
+    # Tambah atribut ke span yang sedang berjalan (misalnya cache="miss" dari dalam fungsi yang di-cache)
+    stack = _stack()
+    if stack:
+        stack[-1].update(atribut)
+
+
+# --- IMPORT MALAS: MODUL BERAT (gspread, plotly, oauth2client) BARU DIMUAT SAAT DIBUTUHKAN ---
+def impor(nama):
+    modul = sys.modules.get(nama)
+    if modul is None:
+        with span("import", modul=nama) as s:
+            modul = importlib.import_module(nama)
+        WAKTU_IMPOR.setdefault(nama, s["durasi_ms"])
+    return modul
+
+
+def ukuran_df(df):
+    return {
+        "baris": len(df),
+        "kolom": len(df.columns),
+        "bytes": int(df.memory_usage(index=False).sum()) if len(df.columns) else 0,
+    }
+
+
+# --- ENDPOINT TEKS PROMETHEUS (GET /metrics) DI PORT TERPISAH ---
+# Tanpa autentikasi, jadi default hanya bisa diakses dari mesin yang sama (host 127.0.0.1)
+def mulai_server_metrics(port, perekam=PEREKAM, host="127.0.0.1"):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] == "/metrics":
+                isi, tipe = perekam.prometheus(), "text/plain; version=0.0.4"
+            elif self.path.split("?")[0] == "/spans":
+                isi, tipe = perekam.jsonl(), "application/x-ndjson"
+            else:
+                self.send_error(404)
+                return
+            body = isi.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", f"{tipe}; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="perf-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+
+from data_prep import BULAN_ID, POLA_TANGGAL, kolom_angka
+
+
+# --- LABEL TANGGAL DI HASIL PIVOT DIKEMBALIKAN KE FORMAT dd/mm/yyyy ---
+# (kolom tanggal sudah bertipe datetime, tapi label pivot bercampur dengan teks 'Grand Total')
+def _fmt_tanggal(v):
+    if isinstance(v, pd.Timestamp):
+        return v.strftime('%d/%m/%Y') if v == v.normalize() else v.strftime('%d/%m/%Y %H:%M')
+    return v
+
+
+def label_tanggal_ke_teks(index_obj):
+    if isinstance(index_obj, pd.MultiIndex):
+        # Cukup format nilai unik per level, kode baris tidak disentuh
+        levels = [pd.Index([_fmt_tanggal(v) for v in level], dtype=object) for level in index_obj.levels]
+        return index_obj.set_levels(levels, verify_integrity=False)
+    return pd.Index([_fmt_tanggal(v) for v in index_obj], name=index_obj.name)
+
+
+# --- KUNCI URUTAN PER KOLOM (DIHITUNG SEKALI PER VERSI DATA) ---
+# Jenis urutan dideteksi dari seluruh nilai unik kolom (bukan dari satu contoh label):
+# tanggal, nama bulan Indonesia, angka, atau teks. Hasilnya = daftar nilai unik yang sudah
+# terurut, jadi mengurutkan label pivot cukup get_indexer + argsort (vektor).
+def buat_kunci_urutan(seri):
+    if isinstance(seri.dtype, pd.CategoricalDtype):
+        nilai = pd.Index(seri.cat.categories)
+    else:
+        nilai = pd.Index(pd.unique(seri.dropna()))
+
+    if pd.api.types.is_datetime64_any_dtype(nilai) or pd.api.types.is_numeric_dtype(nilai):
+        jenis = 'tanggal' if pd.api.types.is_datetime64_any_dtype(nilai) else 'angka'
+        return jenis, nilai.sort_values()
+
+    teks = nilai.astype(str).str.strip().str.upper()
+    cocok_tanggal = teks.str.fullmatch(POLA_TANGGAL)
+    tanggal = pd.to_datetime(teks.where(cocok_tanggal).str.replace('-', '/', regex=False),
+                             dayfirst=True, format='mixed', errors='coerce')
+    bulan = teks.str.split(' ').str[0].map(BULAN_ID)
+    if len(nilai) and tanggal.notna().sum() > len(nilai) * 0.5:
+        jenis, kunci = 'tanggal', pd.Series(tanggal)
+    elif len(nilai) and bulan.notna().sum() > len(nilai) * 0.5:
+        tahun = pd.to_numeric(teks.str.extract(r'(\d{4})')[0], errors='coerce').fillna(0)
+        jenis, kunci = 'bulan', pd.Series(tahun.to_numpy() * 100 + bulan.fillna(50).to_numpy())
+    else:
+        jenis, kunci = 'teks', pd.Series(nilai.astype(str))
+    return jenis, nilai[kunci.sort_values(kind='stable', na_position='last').index]
+
+
+class UrutanKolom:
+    def __init__(self, df):
+        self.jenis = {}
+        self._kunci = {}
+        for kolom in df.columns:
+            self.jenis[kolom], self._kunci[kolom] = buat_kunci_urutan(df[kolom])
+
+    def rank(self, kolom, nilai):
+        # Nilai yang tidak dikenal (mis. 'Grand Total', '') ditaruh paling belakang
+        kunci = self._kunci.get(kolom)
+        if kunci is None:
+            return np.full(len(nilai), 0)
+        pos = kunci.get_indexer(nilai)
+        return np.where(pos < 0, len(kunci), pos)
+
+    def urutkan_nilai(self, kolom, nilai):
+        # Daftar nilai (mis. pilihan filter) dalam urutan yang sama dengan baris/kolom pivot
+        order = np.argsort(self.rank(kolom, pd.Index(nilai)), kind='stable')
+        return [nilai[i] for i in order]
+
+    def urutkan(self, index_obj, nama_kolom):
+        # Hasil: posisi baris/kolom terurut; entri Grand Total tetap di akhir
+        if isinstance(index_obj, pd.MultiIndex):
+            ranks = [self.rank(nama, level)[codes] for nama, level, codes in zip(nama_kolom, index_obj.levels, index_obj.codes)]
+            level0 = index_obj.get_level_values(0)
+            order = np.lexsort(ranks[::-1])
+        else:
+            level0 = index_obj
+            order = np.argsort(self.rank(nama_kolom[0], index_obj), kind='stable')
+        total = np.asarray(level0 == 'Grand Total')
+        return np.concatenate([order[~total[order]], np.flatnonzero(total)])
+
+
+# --- ROLLUP (PRA-AGREGASI) UNTUK DATA MENTAH ---
+# Dibangun sekali saat data di-refresh: data dikelompokkan per kombinasi kolom dimensi,
+# disimpan sebagai agregat parsial (count/sum/min/max per kolom) supaya mean bisa diturunkan.
+# Pivot yang baris/kolom/filternya hanya memakai kolom dimensi dijawab dari rollup ini.
+# Dimensi harus dipilih sendiri (beberapa cube kecil), karena gabungan semua kolom category & tanggal
+# hampir selalu menghasilkan satu kelompok per baris.
+ROLLUP_RASIO_MAX = 0.5  # kalau rollup tidak jauh lebih kecil dari data mentah, tidak usah dipakai
+
+
+def buat_rollup(df, dimensi):
+    dimensi = [c for c in dimensi if c in df.columns]
+    if not dimensi or df.empty:
+        return None
+
+    ukuran = {f"count::{c}": df[c].notna().astype('int64') for c in df.columns}
+    agg = {nama: 'sum' for nama in ukuran}
+    for c in df.columns:
+        # Hanya kolom angka tanpa sel kosong: hasilnya identik dengan to_numeric(...).fillna(0) di pivot biasa
+        if c not in dimensi and pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c]) and df[c].notna().all():
+            for fungsi in ('sum', 'min', 'max'):
+                ukuran[f"{fungsi}::{c}"] = df[c]
+                agg[f"{fungsi}::{c}"] = fungsi
+
+    kunci = [df[d] for d in dimensi]
+    cube = pd.DataFrame(ukuran).groupby(kunci, dropna=False, observed=True, sort=False).agg(agg).reset_index()
+    if len(cube) > len(df) * ROLLUP_RASIO_MAX:
+        return None
+    cube.attrs['dimensi'] = dimensi
+    cube.attrs['versi'] = df.attrs.get('versi')
+    return cube
+
+
+# Satu cube per daftar dimensi; cube yang tidak cukup kecil dibuang. Hasil urut dari cube terkecil.
+def buat_daftar_rollup(df, daftar_dimensi):
+    cube = [buat_rollup(df, dimensi) for dimensi in daftar_dimensi]
+    return sorted((c for c in cube if c is not None), key=len)
+
+
+def _pivot_cube(cube, rows, cols, values, kolom_ukur, aggfunc):
+    data = cube[rows + cols].assign(**{values: cube[kolom_ukur]})
+    return pd.pivot_table(
+        data, index=rows, columns=cols if cols else None,
+        values=values, aggfunc=aggfunc, fill_value=0,
+        margins=True, margins_name='Grand Total', observed=True
+    )
+
+
+def pivot_dari_rollup(cube, kunci_filter, rows, cols, values, agg_func):
+    dimensi = cube.attrs.get('dimensi', [])
+    if not set(rows + cols) <= set(dimensi) or values in rows + cols:
+        return None
+    kunci_filter = kunci_filter or ()
+    if any(kolom not in dimensi for kolom, _ in kunci_filter):
+        return None
+    kolom_ukur = {'count': f"count::{values}", 'sum': f"sum::{values}", 'mean': f"sum::{values}",
+                  'min': f"min::{values}", 'max': f"max::{values}"}[agg_func]
+    if kolom_ukur not in cube.columns:
+        return None
+
+    for kolom, nilai_terpilih in kunci_filter:
+        cube = cube[cube[kolom].isin(list(nilai_terpilih))]
+
+    if agg_func == 'count':
+        # Kelompok yang semua nilainya kosong dijadikan NaN, supaya (seperti pivot_table biasa)
+        # tetap muncul dengan nilai 0 tapi tidak ikut dihitung di Grand Total
+        cube = cube.assign(**{kolom_ukur: cube[kolom_ukur].where(cube[kolom_ukur] > 0)})
+        hasil = _pivot_cube(cube, rows, cols, values, kolom_ukur, 'sum')
+        lengkap = hasil.notna().all()
+        return hasil.astype({kolom: 'int64' for kolom in lengkap[lengkap].index})
+    if agg_func == 'mean':
+        total = _pivot_cube(cube, rows, cols, values, kolom_ukur, 'sum')
+        jumlah = _pivot_cube(cube, rows, cols, values, f"count::{values}", 'sum')
+        return (total / jumlah).fillna(0)
+    return _pivot_cube(cube, rows, cols, values, kolom_ukur, agg_func)
+
+
+# --- PIVOT + PENGURUTAN BARIS/KOLOM ---
+def hitung_pivot(df, rows, cols, values, agg_func, rollup=None, kunci_filter=None, urutan=None):
+    # rollup: daftar cube (hasil buat_daftar_rollup); dipakai cube pertama (terkecil) yang bisa menjawab
+    pivot_result = None
+    for cube in rollup or ():
+        pivot_result = pivot_dari_rollup(cube, kunci_filter, rows, cols, values, agg_func)
+        if pivot_result is not None:
+            break
+
+    if pivot_result is None:
+        if agg_func != 'count':
+            df = df.assign(**{values: kolom_angka(df[values])})
+
+        pivot_result = pd.pivot_table(
+            df, index=rows, columns=cols if cols else None,
+            values=values, aggfunc=agg_func, fill_value=0,
+            margins=True, margins_name='Grand Total', observed=True
+        )
+
+    if urutan is None:
+        urutan = UrutanKolom(df[rows + cols])
+    if cols:
+        pivot_result = pivot_result.iloc[:, urutan.urutkan(pivot_result.columns, cols)]
+    pivot_result = pivot_result.iloc[urutan.urutkan(pivot_result.index, rows)]
+
+    pivot_result.index = label_tanggal_ke_teks(pivot_result.index)
+    pivot_result.columns = label_tanggal_ke_teks(pivot_result.columns)
+    return pivot_result
+
+
+# --- DATA UNTUK GRAFIK: PIVOT TANPA GRAND TOTAL, KOLOM MULTIINDEX DIGABUNG ---
+def data_grafik(pivot_result):
+    chart_df = pivot_result.copy()
+    if 'Grand Total' in chart_df.index: chart_df = chart_df.drop('Grand Total', axis=0)
+    if 'Grand Total' in chart_df.columns: chart_df = chart_df.drop(columns=['Grand Total'])
+
+    if isinstance(chart_df.columns, pd.MultiIndex):
+        chart_df.columns = [' - '.join(map(str, col)).strip() for col in chart_df.columns.values]
+    return chart_df, chart_df.reset_index()
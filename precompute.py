@@ -0,0 +1,89 @@
+import argparse
+import logging
+import os
+import time
+
+import konfigurasi
+import perf
+import refresher
+import sheets_client
+import snapshot_cache
+import sumber_data
+
+logger = logging.getLogger("precompute")
+
+WORKERS_DEFAULT = 4
+JEDA_STATUS = 60  # detik antar log status di mode jalan terus
+
+
+# --- WORKER PRECOMPUTE: AMBIL SEMUA DATASET DI LUAR PROSES STREAMLIT ---
+# Membaca DATASET yang sama dengan routing app (konfigurasi.py), lalu ambil -> bersihkan ->
+# deteksi tipe -> rollup dan tulis hasilnya ke folder snapshot. App yang dijalankan dengan
+# SNAPSHOT_ONLY=1 hanya membaca folder ini, jadi beberapa replika app berbagi satu fetch.
+# Backend palsu untuk uji offline: GSHEET_FAKE=<file.json> (lihat fake_sheets.py).
+def buat_daftar(pool, dataset=None):
+    # [(key, ambil, interval, kunci_fetch), ...]; satu DeltaSync per tab, dipakai ulang antar putaran
+    delta = {}
+    daftar = []
+    for key, interval in (dataset or konfigurasi.DATASET).items():
+        sheet_id, nama_tab, range_cell = key
+        delta_sync = None
+        if not range_cell and (sheet_id, nama_tab) in konfigurasi.TAB_DELTA_SYNC:
+            if (sheet_id, nama_tab) not in delta:
+                delta[(sheet_id, nama_tab)] = sheets_client.DeltaSync(pool, sheet_id, nama_tab)
+            delta_sync = delta[(sheet_id, nama_tab)]
+        ambil = sumber_data.fungsi_ambil(pool, sheet_id, nama_tab, range_cell, delta_sync)
+        daftar.append((key, ambil, interval, sumber_data.kunci_fetch(*key)))
+    return daftar
+
+
+def jalankan_sekali(store, daftar, max_workers=WORKERS_DEFAULT):
+    # Semua dataset diambil ulang (umur_maks 0), paralel per unit fetch. Hasil: {key: status}
+    warmup = refresher.WarmUp(store, max_workers=max_workers)
+    warmup.mulai([(key, ambil, 0, kunci_fetch) for key, ambil, _, kunci_fetch in daftar])
+    while not warmup.selesai():
+        time.sleep(0.2)
+    return warmup.status()
+
+
+def jalankan_terus(store, daftar):
+    # Refresher yang sama dengan di app: tiap dataset sesuai interval DATASET, dengan jitter & backoff.
+    # Putaran pertama sudah dikerjakan jalankan_sekali, jadi refresh berikutnya baru setelah satu interval.
+    bg = refresher.Refresher(store)
+    for key, ambil, interval, kunci_fetch in daftar:
+        bg.daftar(key, ambil, interval, kunci_fetch=kunci_fetch, tunda=interval)
+    bg.start()
+    while True:
+        time.sleep(JEDA_STATUS)
+        for unit, status in bg.status().items():
+            logger.info("%s: gagal %d kali, refresh berikut %.0f detik lagi", unit, status["gagal"], status["berikut_detik"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker precompute: tulis semua dataset dashboard ke folder snapshot.")
+    parser.add_argument("--folder", default=konfigurasi.SNAPSHOT_DIR, help="folder snapshot yang dibaca app")
+    parser.add_argument("--sekali", action="store_true", help="ambil semua dataset satu kali lalu keluar")
+    parser.add_argument("--workers", type=int, default=WORKERS_DEFAULT, help="jumlah fetch paralel di mode --sekali")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    perf.PEREKAM.file_log = os.environ.get("PERF_LOG")
+
+    store = snapshot_cache.SnapshotStore(args.folder)
+    daftar = buat_daftar(sumber_data.buat_pool())
+
+    # Putaran pertama selalu lengkap, supaya app langsung punya data begitu worker jalan
+    mulai = time.perf_counter()
+    status = jalankan_sekali(store, daftar, args.workers)
+    for (sheet_id, nama_tab, range_cell), s in status.items():
+        logger.info("%s %s: %s", nama_tab, range_cell or "", s)
+    gagal = [key for key, s in status.items() if s == "gagal"]
+    logger.info("Selesai %d dataset dalam %.1f detik, %d gagal", len(status), time.perf_counter() - mulai, len(gagal))
+
+    if args.sekali:
+        return 1 if gagal else 0
+    jalankan_terus(store, daftar)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
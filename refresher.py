@@ -0,0 +1,128 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+JEDA_GAGAL_MAKS = 15 * 60  # detik
+
+
+# --- REFRESHER BACKGROUND (SATU THREAD PER PROSES SERVER) ---
+# Setiap dataset terdaftar di-refresh ke snapshot store sesuai intervalnya masing-masing
+# (ditambah jitter supaya tidak serentak). Halaman cukup membaca snapshot, tidak menunggu Google.
+class Refresher:
+    def __init__(self, store, jitter=0.2):
+        self._store = store
+        self._jitter = jitter
+        self._jobs = {}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def daftar(self, key, ambil, interval, kunci_fetch=None, tunda=0):
+        # Dataset yang diambil bersama (batch) cukup punya satu job.
+        # tunda: jeda sebelum refresh pertama (misalnya kalau data baru saja diambil)
+        unit = kunci_fetch or key
+        with self._cond:
+            if unit in self._jobs:
+                return
+            self._jobs[unit] = {
+                "key": key, "ambil": ambil, "interval": interval, "kunci_fetch": kunci_fetch,
+                "berikut": time.monotonic() + tunda + random.uniform(0, interval * self._jitter), "gagal": 0,
+            }
+            self._cond.notify()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="sheets-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def status(self):
+        with self._cond:
+            return {unit: {"interval": job["interval"], "gagal": job["gagal"],
+                           "berikut_detik": round(job["berikut"] - time.monotonic(), 1)}
+                    for unit, job in self._jobs.items()}
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                sekarang = time.monotonic()
+                jatuh_tempo = [unit for unit, job in self._jobs.items() if job["berikut"] <= sekarang]
+                if not jatuh_tempo:
+                    berikut = min((job["berikut"] for job in self._jobs.values()), default=sekarang + 60)
+                    self._cond.wait(timeout=max(berikut - sekarang, 0.1))
+                    continue
+            for unit in jatuh_tempo:
+                self._jalankan(unit)
+
+    def _jalankan(self, unit):
+        job = self._jobs[unit]
+        try:
+            self._store.refresh(job["key"], job["ambil"], job["kunci_fetch"])
+            job["gagal"] = 0
+            jeda = job["interval"]
+        except Exception:
+            job["gagal"] += 1
+            jeda = min(job["interval"] * 2 ** job["gagal"], JEDA_GAGAL_MAKS)
+            logger.exception("Refresh background gagal untuk %s (gagal %d kali)", unit, job["gagal"])
+        with self._cond:
+            job["berikut"] = time.monotonic() + jeda * random.uniform(1 - self._jitter, 1 + self._jitter)
+
+
+# --- WARM-UP PARALEL SAAT APP START ---
+# Semua dataset yang belum punya snapshot segar diambil bersamaan di thread pool terbatas,
+# supaya klik pertama dari menu tidak menunggu fetch Google satu per satu.
+class WarmUp:
+    def __init__(self, store, max_workers=4):
+        self._store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="warmup")
+        self._lock = threading.Lock()
+        self._status = {}
+
+    def mulai(self, daftar):
+        # daftar: [(key, ambil, umur_maks, kunci_fetch), ...]; key dengan kunci_fetch sama cukup diambil sekali
+        grup = {}
+        for key, ambil, umur_maks, kunci_fetch in daftar:
+            grup.setdefault(kunci_fetch or key, []).append((key, ambil, umur_maks, kunci_fetch))
+
+        for unit, anggota in grup.items():
+            segar = all(
+                (umur := self._store.umur(key)) is not None and umur <= umur_maks
+                for key, _, umur_maks, _ in anggota
+            )
+            with self._lock:
+                for key, *_ in anggota:
+                    self._status[key] = "siap" if segar else "menunggu"
+            if not segar:
+                key, ambil, _, kunci_fetch = anggota[0]
+                self._executor.submit(self._jalankan, [k for k, *_ in anggota], key, ambil, kunci_fetch)
+        return self
+
+    def _jalankan(self, daftar_key, key, ambil, kunci_fetch):
+        self._set(daftar_key, "memuat")
+        try:
+            self._store.refresh(key, ambil, kunci_fetch)
+            self._set(daftar_key, "siap")
+        except Exception:
+            logger.exception("Warm-up gagal untuk %s", key)
+            self._set(daftar_key, "gagal")
+
+    def _set(self, daftar_key, status):
+        with self._lock:
+            for key in daftar_key:
+                self._status[key] = status
+
+    def status(self):
+        with self._lock:
+            return dict(self._status)
+
+    def progres(self):
+        status = self.status()
+        if not status:
+            return 1.0
+        return sum(s in ("siap", "gagal") for s in status.values()) / len(status)
+
+    def selesai(self):
+        return self.progres() >= 1.0
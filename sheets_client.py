@@ -0,0 +1,245 @@
+import hashlib
+import random
+import threading
+import time
+
+import perf
+
+SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+
+
+# gspread berat untuk di-import; baru dimuat saat benar-benar mengambil data (perf.impor)
+def _gspread():
+    return perf.impor("gspread")
+
+
+# Error yang bukan masalah koneksi: tidak perlu reconnect, langsung dilempar
+def error_tanpa_reconnect():
+    gspread = _gspread()
+    return (gspread.exceptions.WorksheetNotFound, gspread.exceptions.SpreadsheetNotFound)
+
+
+def status_api_error(e):
+    if isinstance(e, _gspread().exceptions.APIError):
+        try:
+            return int(e.response.status_code)
+        except Exception:
+            return None
+    return None
+
+
+# --- RETRY DENGAN EXPONENTIAL BACKOFF SAAT KENA LIMIT KUOTA (HTTP 429) ---
+def dengan_backoff(fungsi, percobaan=5, jeda=1.0, jeda_maks=32.0):
+    for ke in range(percobaan):
+        try:
+            return fungsi()
+        except Exception as e:
+            if status_api_error(e) != 429 or ke == percobaan - 1:
+                raise
+            tunggu = min(jeda * 2 ** ke, jeda_maks)
+            time.sleep(tunggu + random.uniform(0, tunggu / 2))
+
+
+# --- POOL KONEKSI GOOGLE SHEET (SATU PER PROSES, DIPAKAI SEMUA SESSION) ---
+class SheetsPool:
+    def __init__(self, creds_factory, authorize=None, max_age=45 * 60):
+        self._creds_factory = creds_factory
+        self._authorize = authorize
+        self._max_age = max_age
+        self._lock = threading.RLock()
+        self._client = None
+        self._client_dibuat = 0.0
+        self._spreadsheets = {}
+        self._worksheets = {}
+        self.stats = {"authorize": 0, "open": 0, "worksheet": 0, "reconnect": 0}
+
+    def _get_client(self):
+        with self._lock:
+            umur = time.monotonic() - self._client_dibuat
+            if self._client is None or umur > self._max_age:
+                # Token service account berlaku 1 jam, jadi client diganti sebelum itu
+                self._spreadsheets.clear()
+                self._worksheets.clear()
+                authorize = self._authorize or _gspread().authorize
+                with perf.span("auth"):
+                    self._client = authorize(self._creds_factory())
+                self._client_dibuat = time.monotonic()
+                self.stats["authorize"] += 1
+            return self._client
+
+    def spreadsheet(self, sheet_id):
+        with self._lock:
+            client = self._get_client()
+            if sheet_id not in self._spreadsheets:
+                self._spreadsheets[sheet_id] = client.open_by_key(sheet_id)
+                self.stats["open"] += 1
+            return self._spreadsheets[sheet_id]
+
+    def worksheet(self, sheet_id, nama_tab):
+        with self._lock:
+            key = (sheet_id, nama_tab)
+            if key not in self._worksheets:
+                self._worksheets[key] = self.spreadsheet(sheet_id).worksheet(nama_tab)
+                self.stats["worksheet"] += 1
+            return self._worksheets[key]
+
+    def reset(self):
+        with self._lock:
+            self._client = None
+            self._spreadsheets.clear()
+            self._worksheets.clear()
+
+    def _jalankan(self, ambil_handle, aksi):
+        try:
+            return aksi(ambil_handle())
+        except Exception as e:
+            # Kena limit kuota bukan masalah koneksi, reconnect malah menambah request
+            if isinstance(e, error_tanpa_reconnect()) or status_api_error(e) == 429:
+                raise
+            self.reset()
+            self.stats["reconnect"] += 1
+            return aksi(ambil_handle())
+
+    def fetch(self, sheet_id, nama_tab, aksi):
+        return self._jalankan(lambda: self.worksheet(sheet_id, nama_tab), aksi)
+
+    def fetch_spreadsheet(self, sheet_id, aksi):
+        return self._jalankan(lambda: self.spreadsheet(sheet_id), aksi)
+
+    def batch_get(self, sheet_id, daftar_range):
+        # daftar_range: [(nama_tab, range_cell), ...] -> {(nama_tab, range_cell): rows}, satu request
+        absolute_range_name = perf.impor("gspread.utils").absolute_range_name
+        nama_range = [absolute_range_name(tab, rng) for tab, rng in daftar_range]
+        hasil = self.fetch_spreadsheet(sheet_id, lambda sh: sh.values_batch_get(nama_range))
+        value_ranges = hasil.get("valueRanges", [])
+        return {key: vr.get("values", []) for key, vr in zip(daftar_range, value_ranges)}
+
+
+def huruf_kolom(nomor):
+    # 1 -> A, 26 -> Z, 27 -> AA (tanpa gspread, karena dipakai saat konfigurasi dibaca)
+    huruf = ""
+    while nomor > 0:
+        nomor, sisa = divmod(nomor - 1, 26)
+        huruf = chr(ord("A") + sisa) + huruf
+    return huruf
+
+
+def range_kolom(kolom_start, kolom_end):
+    # Potongan iloc[:, kolom_start:kolom_end] -> range A1 kolom penuh, misalnya (3, 6) -> "D:F"
+    return f"{huruf_kolom(kolom_start + 1)}:{huruf_kolom(kolom_end)}"
+
+
+def rapikan_baris(rows):
+    # Samakan format hasil get() (sel kosong di ujung dibuang) dengan get_all_values() (dipadding)
+    hasil = []
+    for row in rows:
+        cells = list(row)
+        while cells and cells[-1] == "":
+            cells.pop()
+        hasil.append(cells)
+    while hasil and not hasil[-1]:
+        hasil.pop()
+    return hasil
+
+
+# --- SINKRON BERTAHAP UNTUK TAB YANG HANYA BERTAMBAH BARIS DI BAWAH ---
+# Setiap sync hanya mengambil baris baru (plus beberapa baris terakhir sebagai overlap),
+# header, dan satu blok baris lama secara bergiliran sebagai checksum. Kalau ada yang
+# berbeda (baris lama diedit/dihapus/disisipkan, atau header berubah) -> full resync.
+# Blok bergilir butuh banyak sync untuk memutari tab besar, jadi full resync juga dipaksa
+# setelah umur_full_maks detik: edit di baris lama paling lambat terlihat setelah selang itu.
+# Isi tab tidak disimpan: yang tinggal di memori hanya header, digest per blok penuh,
+# dan baris-baris terakhir (blok yang belum penuh + overlap).
+class DeltaSync:
+    def __init__(self, pool, sheet_id, nama_tab, overlap=50, blok_cek=500, umur_full_maks=30 * 60):
+        self._pool = pool
+        self._sheet_id = sheet_id
+        self._tab = nama_tab
+        self._overlap = overlap
+        self._blok_cek = blok_cek
+        self._umur_full_maks = umur_full_maks
+        self._waktu_full = None
+        self._lock = threading.Lock()
+        self._n = 0            # jumlah baris termasuk header pada sync terakhir
+        self._lebar = 0
+        self._header = None
+        self._digest = []      # digest blok penuh: baris 1..blok_cek, blok_cek+1..2*blok_cek, ...
+        self._akhir = []       # baris mulai indeks _awal_akhir (0-based) sampai baris terakhir
+        self._awal_akhir = 0
+        self._blok = 0
+        # Hasil olahan terakhir milik pemanggil (DataFrame), tempat baris baru ditambahkan (lihat sumber_data)
+        self.frame = None
+        self.versi = 0
+        self.stats = {"full": 0, "delta": 0, "baris_baru": 0}
+
+    def _digest_blok(self, rows):
+        return hashlib.sha1(repr(rapikan_baris(rows)).encode("utf-8")).digest()
+
+    def _tambah(self, rows):
+        self._akhir.extend(rows)
+        self._n += len(rows)
+        # Blok yang sudah penuh diringkas jadi digest, barisnya dibuang (kecuali yang masih jadi overlap)
+        while (len(self._digest) + 1) * self._blok_cek <= self._n:
+            mulai = len(self._digest) * self._blok_cek - self._awal_akhir
+            self._digest.append(self._digest_blok(self._akhir[mulai:mulai + self._blok_cek]))
+        simpan_dari = min(len(self._digest) * self._blok_cek, max(0, self._n - self._overlap))
+        if simpan_dari > self._awal_akhir:
+            del self._akhir[:simpan_dari - self._awal_akhir]
+            self._awal_akhir = simpan_dari
+
+    def _full_sync(self):
+        rows = self._pool.fetch(self._sheet_id, self._tab, lambda ws: ws.get_all_values())
+        self._lebar = len(rows[0]) if rows else 0
+        self._header = rapikan_baris(rows[:1])
+        self._n, self._digest, self._akhir, self._awal_akhir = 0, [], [], 0
+        self._tambah(rows)
+        self._blok = 0
+        self._waktu_full = time.monotonic()
+        self.versi += 1
+        self.stats["full"] += 1
+        return rows
+
+    def reset(self):
+        # Sync berikutnya jadi full sync (misalnya kalau baris baru gagal diolah pemanggil)
+        with self._lock:
+            self._n = 0
+
+    def sync(self, paksa_full=False):
+        # Hasil: (baris, penuh). penuh=True -> semua baris termasuk header (full sync);
+        # penuh=False -> hanya baris baru sejak sync sebelumnya (bisa kosong).
+        with self._lock:
+            if paksa_full or not self._n or time.monotonic() - self._waktu_full > self._umur_full_maks:
+                return self._full_sync(), True
+
+            n = self._n
+            kolom = huruf_kolom(self._lebar)
+            awal_ekor = max(2, n - self._overlap + 1)
+
+            r_header = "1:1"
+            r_ekor = f"A{awal_ekor}:{kolom}"
+            ranges = [(self._tab, r_header), (self._tab, r_ekor)]
+            if self._digest:
+                i = self._blok % len(self._digest)
+                r_blok = f"{i * self._blok_cek + 1}:{(i + 1) * self._blok_cek}"
+                ranges.append((self._tab, r_blok))
+            hasil = self._pool.batch_get(self._sheet_id, ranges)
+            self._blok += 1
+            self.stats["delta"] += 1
+
+            ekor = hasil[(self._tab, r_ekor)]
+            ekor_lama = self._akhir[awal_ekor - 1 - self._awal_akhir:]
+            masih_sama = (
+                rapikan_baris(hasil[(self._tab, r_header)]) == self._header
+                and (not self._digest or self._digest_blok(hasil[(self._tab, r_blok)]) == self._digest[i])
+                and len(ekor) >= len(ekor_lama)
+                and rapikan_baris(ekor[:len(ekor_lama)]) == rapikan_baris(ekor_lama)
+            )
+            if not masih_sama:
+                return self._full_sync(), True
+
+            baru = [list(row) + [""] * (self._lebar - len(row)) for row in ekor[len(ekor_lama):]]
+            if baru:
+                self._tambah(baru)
+                self.versi += 1
+                self.stats["baris_baru"] += len(baru)
+            return baru, False
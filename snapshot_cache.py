@@ -0,0 +1,117 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+
+import pyarrow.feather as feather
+
+logger = logging.getLogger(__name__)
+
+
+# --- SINGLE-FLIGHT: SATU KEY HANYA DIAMBIL SEKALI PADA SAAT YANG SAMA ---
+# Request lain untuk key yang sedang diambil cukup menunggu dan memakai hasil yang sama.
+class _Flight:
+    def __init__(self):
+        self.selesai = threading.Event()
+        self.hasil = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jalan = {}
+
+    def sedang_jalan(self, key):
+        with self._lock:
+            return key in self._jalan
+
+    def jalankan(self, key, fungsi):
+        with self._lock:
+            flight = self._jalan.get(key)
+            pemilik = flight is None
+            if pemilik:
+                flight = self._jalan[key] = _Flight()
+
+        if not pemilik:
+            flight.selesai.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.hasil
+
+        try:
+            flight.hasil = fungsi()
+            return flight.hasil
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._jalan[key]
+            flight.selesai.set()
+
+
+# --- SNAPSHOT DI DISK (ARROW IPC / FEATHER) DENGAN STALE-WHILE-REVALIDATE ---
+# Setelah restart container, halaman langsung tampil dari snapshot terakhir di disk,
+# sementara data baru diambil dari Google di thread background.
+class SnapshotStore:
+    def __init__(self, folder):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+        self._flight = SingleFlight()
+
+    def path(self, key):
+        nama = re.sub(r"[^A-Za-z0-9]+", "_", "_".join(str(k) for k in key[1:] if k))[:60]
+        kode = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.folder, f"{nama}_{kode}.feather")
+
+    def umur(self, key):
+        try:
+            return time.time() - os.path.getmtime(self.path(key))
+        except FileNotFoundError:
+            return None
+
+    def baca(self, key):
+        path = self.path(key)
+        try:
+            umur = time.time() - os.path.getmtime(path)
+            # memory_map + split_blocks: kolom angka/tanggal menunjuk langsung ke file yang dipetakan OS
+            # (zero-copy, read-only), tidak disalin ke blok pandas baru
+            df = feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+            return df, umur
+        except FileNotFoundError:
+            return None, None
+
+    def tulis(self, key, df):
+        path = self.path(key)
+        # pid + thread: worker precompute & beberapa replika app bisa menulis ke folder yang sama
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        feather.write_feather(df, tmp, compression="uncompressed")
+        os.replace(tmp, path)
+
+    def _tulis_semua(self, hasil):
+        for k, df in hasil.items():
+            self.tulis(k, df)
+        return hasil
+
+    def refresh(self, key, ambil, kunci_fetch=None):
+        # ambil() -> {key: DataFrame}; boleh berisi beberapa key sekaligus (misalnya hasil batch).
+        # kunci_fetch: key yang diambil bersama (batch) memakai kunci_fetch yang sama.
+        return self._flight.jalankan(kunci_fetch or key, lambda: self._tulis_semua(ambil()))
+
+    def _refresh_background(self, key, ambil, kunci_fetch):
+        try:
+            self.refresh(key, ambil, kunci_fetch)
+        except Exception:
+            logger.exception("Gagal refresh snapshot %s", key)
+
+    def muat(self, key, ambil, ttl, kunci_fetch=None):
+        df, umur = self.baca(key)
+        if df is None:
+            return self.refresh(key, ambil, kunci_fetch)[key]
+
+        if umur > ttl and not self._flight.sedang_jalan(kunci_fetch or key):
+            threading.Thread(target=self._refresh_background, args=(key, ambil, kunci_fetch), daemon=True).start()
+        return df
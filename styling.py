@@ -0,0 +1,66 @@
+import operator
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+STYLE_MERAH = 'background-color: #ffcccc; color: black'
+
+OPERATOR = {
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+    "==": operator.eq, "!=": operator.ne,
+}
+
+# Satu aturan pewarnaan: sel/baris yang nilai `kolom`-nya memenuhi `op nilai` diberi `style`.
+# kolom=None berarti kolom kunci dashboard. Aturan belakangan menimpa aturan sebelumnya.
+Aturan = namedtuple("Aturan", ["kolom", "op", "nilai", "style", "seluruh_baris"], defaults=[True])
+
+
+# Aturan bawaan (sama seperti highlight_dynamic dulu): baris dengan kolom kunci < 100 diwarnai merah
+def aturan_default():
+    return (Aturan(None, "<", 100, STYLE_MERAH),)
+
+
+# Kolom kunci dijadikan angka untuk ditampilkan (sel kosong/teks -> 0).
+# Hanya kolom kunci yang dibuat baru; kolom lain tetap berbagi data dengan df (copy-on-write).
+def siapkan_tampilan(df, kolom_kunci):
+    kunci = df[kolom_kunci]
+    if not pd.api.types.is_numeric_dtype(kunci):
+        # Kolom belum jadi angka (ada sel kosong/teks), konversi manual seperti biasa
+        kunci = pd.to_numeric(kunci.astype(str).str.replace(',', '.', regex=False).str.rstrip('%'), errors='coerce')
+    return df.assign(**{kolom_kunci: kunci.fillna(0)})
+
+
+# --- CSS PER SEL DIHITUNG SEKALIGUS (MASK VEKTOR), BUKAN FUNGSI PYTHON PER BARIS ---
+def hitung_css(df, kolom_kunci, aturan):
+    css = np.full(df.shape, '', dtype=object)
+    for a in aturan:
+        kolom = a.kolom or kolom_kunci
+        if kolom not in df.columns:
+            continue
+        seri = df[kolom]
+        if isinstance(a.nilai, (int, float)):
+            seri = pd.to_numeric(seri, errors='coerce')
+        mask = OPERATOR[a.op](seri, a.nilai).to_numpy(dtype=bool, na_value=False)
+        if a.seluruh_baris:
+            css[mask, :] = a.style
+        else:
+            css[mask, df.columns.get_loc(kolom)] = a.style
+    return pd.DataFrame(css, index=df.index, columns=df.columns)
+
+
+def siapkan_styler(df, kolom_kunci, aturan=None):
+    df_display = siapkan_tampilan(df, kolom_kunci)
+    return df_display, hitung_css(df_display, kolom_kunci, aturan or aturan_default())
+
+
+def styler_dari_css(df_display, css, kolom_kunci):
+    # Satu panggilan apply untuk seluruh tabel; CSS-nya sudah jadi
+    styled_df = df_display.style.apply(lambda _: css, axis=None)
+    return styled_df.format({kolom_kunci: "{:.2f}"})
+
+
+# Tabel dashboard standar: kolom kunci dijadikan angka, baris di bawah target diwarnai merah
+def buat_styler(df, kolom_kunci, aturan=None):
+    df_display, css = siapkan_styler(df, kolom_kunci, aturan)
+    return styler_dari_css(df_display, css, kolom_kunci)
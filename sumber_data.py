@@ -0,0 +1,124 @@
+import json
+import os
+
+import data_prep
+import perf
+import pivot_engine
+import sheets_client
+from konfigurasi import RANGE_BATCH, ROLLUP_DIMENSI, TAB_KUNCI_WAJIB_ISI
+
+
+# --- KONEKSI (TANPA STREAMLIT, DIPAKAI APP & WORKER) ---
+# secrets: st.secrets dari app; worker cukup memakai GCP_JSON atau kredensial.json
+def buat_kredensial(secrets=None):
+    ServiceAccountCredentials = perf.impor("oauth2client.service_account").ServiceAccountCredentials
+    scope = sheets_client.SCOPE
+    if "GCP_JSON" in os.environ:
+        creds_dict = json.loads(os.environ["GCP_JSON"])
+        return ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
+    elif secrets is not None and "gcp_service_account" in secrets:
+        creds_dict = secrets["gcp_service_account"]
+        return ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
+    else:
+        return ServiceAccountCredentials.from_json_keyfile_name("kredensial.json", scope)
+
+
+# GSHEET_FAKE=<file.json> memakai backend palsu (lihat fake_sheets.py) untuk pengukuran offline.
+def buat_pool(secrets=None):
+    if "GSHEET_FAKE" in os.environ:
+        fake_sheets = perf.impor("fake_sheets")
+        fake = fake_sheets.FakeClient.from_json(
+            os.environ["GSHEET_FAKE"], latency=float(os.environ.get("GSHEET_FAKE_LATENCY", "0"))
+        )
+        return sheets_client.SheetsPool(lambda: None, authorize=fake.authorize)
+    return sheets_client.SheetsPool(lambda: buat_kredensial(secrets))
+
+
+# --- AMBIL -> BERSIHKAN -> DETEKSI TIPE -> PRA-AGREGASI ---
+def ambil_dari_google(pool, sheet_id, nama_tab, range_cell=None, delta_sync=None):
+    # Hasil: {(sheet_id, nama_tab, range_cell): DataFrame}. Range yang terdaftar di RANGE_BATCH
+    # diambil bersama semua range lain di batch yang sama dalam satu request.
+    daftar_batch = RANGE_BATCH.get(sheet_id, ())
+    if range_cell and (nama_tab, range_cell) in daftar_batch:
+        with perf.span("fetch", tab=nama_tab, range="batch") as s:
+            hasil = pool.batch_get(sheet_id, daftar_batch)
+            s["sel"] = sum(len(row) for rows in hasil.values() for row in rows)
+        return {(sheet_id, tab, rng): buat_dataframe_terukur(rows) for (tab, rng), rows in hasil.items()}
+
+    if delta_sync is not None and not range_cell:
+        df = ambil_delta(delta_sync, sheet_id, nama_tab)
+    else:
+        with perf.span("fetch", tab=nama_tab, range=range_cell) as s:
+            if range_cell:
+                data = pool.fetch(sheet_id, nama_tab, lambda ws: ws.get(range_cell))
+            else:
+                data = pool.fetch(sheet_id, nama_tab, lambda ws: ws.get_all_values())
+            s["sel"] = len(data) * len(data[0]) if data else 0
+        df = buat_dataframe_terukur(saring_data(data, sheet_id, nama_tab))
+    hasil = {(sheet_id, nama_tab, range_cell): df}
+    if not range_cell and (sheet_id, nama_tab) in ROLLUP_DIMENSI:
+        # Snapshot per cube: (sheet_id, nama_tab, None, 'rollup', nomor urut di ROLLUP_DIMENSI)
+        for i, dimensi in enumerate(ROLLUP_DIMENSI[(sheet_id, nama_tab)]):
+            with perf.span("rollup", tab=nama_tab, dimensi="/".join(dimensi)) as s:
+                rollup = pivot_engine.buat_rollup(df, dimensi)
+                s["baris"] = 0 if rollup is None else len(rollup)
+            if rollup is not None:
+                hasil[(sheet_id, nama_tab, range_cell, 'rollup', i)] = rollup
+    return hasil
+
+
+def saring_data(data, sheet_id, nama_tab):
+    if (sheet_id, nama_tab) in TAB_KUNCI_WAJIB_ISI:
+        return data_prep.saring_kunci_kosong(data)
+    return data
+
+
+# Tab dengan DeltaSync: baris baru ditambahkan ke frame hasil sync sebelumnya (delta_sync.frame),
+# frame hanya dibangun ulang dari semua baris setelah full sync
+def ambil_delta(delta_sync, sheet_id, nama_tab):
+    try:
+        with perf.span("fetch", tab=nama_tab, range="delta") as s:
+            data, penuh = delta_sync.sync()
+            s["sel"] = len(data) * len(data[0]) if data else 0
+            s["penuh"] = penuh
+        df = None
+        if not penuh and delta_sync.frame is not None:
+            df = delta_sync.frame
+            baru = saring_data([list(df.columns)] + data, sheet_id, nama_tab)[1:] if data else []
+            if baru:
+                with perf.span("tambah_baris", tab=nama_tab) as s:
+                    df = data_prep.tambah_baris(df, baru)
+                    s["baris"] = len(baru)
+        if df is None:
+            if not penuh:
+                # Baris baru tidak cocok dengan tipe kolom lama (atau belum ada frame) -> bangun ulang penuh
+                data, _ = delta_sync.sync(paksa_full=True)
+            df = buat_dataframe_terukur(saring_data(data, sheet_id, nama_tab))
+    except Exception:
+        # Frame dan status sync bisa tidak sejalan lagi -> putaran berikutnya mulai dari full sync
+        delta_sync.reset()
+        raise
+    delta_sync.frame = df
+    return df
+
+
+# Parse + deteksi tipe kolom, dicatat sebagai span tersendiri
+def buat_dataframe_terukur(data):
+    with perf.span("buat_dataframe") as s:
+        df = data_prep.buat_dataframe(data)
+        s.update(perf.ukuran_df(df))
+    return df
+
+
+# Range yang satu batch berbagi satu kunci fetch, jadi tidak pernah diambil dobel bersamaan
+def kunci_fetch(sheet_id, nama_tab, range_cell=None):
+    if range_cell and (nama_tab, range_cell) in RANGE_BATCH.get(sheet_id, ()):
+        return (sheet_id, 'batch')
+    return (sheet_id, nama_tab, range_cell)
+
+
+def fungsi_ambil(pool, sheet_id, nama_tab, range_cell=None, delta_sync=None):
+    # Kena limit kuota (429) -> tunggu dengan exponential backoff, bukan langsung gagal
+    return lambda: sheets_client.dengan_backoff(
+        lambda: ambil_dari_google(pool, sheet_id, nama_tab, range_cell, delta_sync)
+    )
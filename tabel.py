@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from pivot_engine import buat_kunci_urutan
+
+
+# --- PENCARIAN & PENGURUTAN DI SERVER UNTUK TABEL BERHALAMAN ---
+# Hasilnya hanya posisi baris; yang dikirim ke browser cukup potongan satu halaman.
+def cari_baris(df, teks):
+    teks = teks.strip().lower()
+    mask = np.zeros(len(df), dtype=bool)
+    for i in range(df.shape[1]):
+        seri = df.iloc[:, i]
+        if isinstance(seri.dtype, pd.CategoricalDtype):
+            # Cukup cek daftar kategori, lalu petakan lewat kode
+            cocok = pd.Index(seri.cat.categories).astype(str).str.lower().str.contains(teks, regex=False)
+            codes = seri.cat.codes.to_numpy()
+            mask |= np.append(np.asarray(cocok, dtype=bool), False)[codes]
+        else:
+            mask |= seri.astype(str).str.lower().str.contains(teks, regex=False).to_numpy(dtype=bool, na_value=False)
+    return mask
+
+
+def urutkan_baris(seri, naik=True):
+    # Urutan "pintar" yang sama dengan pivot (tanggal, nama bulan, angka, teks); sel kosong selalu di akhir
+    _, kunci = buat_kunci_urutan(seri)
+    pos = kunci.get_indexer(seri)
+    if naik:
+        return np.argsort(np.where(pos < 0, len(kunci), pos), kind='stable')
+    return np.argsort(-np.where(pos < 0, -1, pos), kind='stable')
+
+
+def posisi_tampil(df, cari=None, kolom_urut=None, naik=True, dengan_index=False):
+    # dengan_index: index ikut dicari/diurutkan (tabel pivot); baris Grand Total tetap di akhir.
+    # Index dicari terpisah dari isi tabel (tanpa reset_index, yang menyalin pivot lebar jadi frame baru).
+    index = df.index.to_frame(index=False) if dengan_index else None
+    posisi = np.arange(len(df))
+    if kolom_urut is not None:
+        seri = index[kolom_urut] if index is not None and kolom_urut in index.columns else df[kolom_urut]
+        posisi = urutkan_baris(seri, naik)
+    if cari:
+        cocok = cari_baris(df, cari)
+        if index is not None:
+            cocok |= cari_baris(index, cari)
+        posisi = posisi[cocok[posisi]]
+
+    if dengan_index:
+        level0 = df.index.get_level_values(0) if isinstance(df.index, pd.MultiIndex) else df.index
+        total = np.flatnonzero(np.asarray(level0 == 'Grand Total'))
+        if len(total):
+            posisi = np.concatenate([posisi[~np.isin(posisi, total)], total])
+    return posisi
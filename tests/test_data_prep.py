@@ -0,0 +1,25 @@
+import pandas as pd
+
+import data_prep
+import pivot_engine
+
+
+# --- HASIL RANGE DENGAN SEL KOSONG DI UJUNG KANAN YANG DIBUANG API ---
+def test_header_lebih_pendek_dari_baris_data():
+    data = [["NAMA", "NIK"], ["A", "1", "x"], ["B", "2"]]
+    df = data_prep.buat_dataframe(data)
+    assert df.shape == (2, 3)
+    assert list(df.iloc[:, 2]) == ["x", ""]
+
+
+def test_saring_kunci_kosong_meratakan_semua_baris():
+    data = [["NAMA"], ["A", "1"], ["", "2"], [], ["B"]]
+    assert data_prep.saring_kunci_kosong(data) == [["NAMA", ""], ["A", "1"], ["B", ""]]
+
+
+# --- KOLOM NILAI TEKS DI PIVOT ---
+def test_pivot_desimal_koma_dengan_sel_kosong():
+    df = data_prep.buat_dataframe([["STO", "NILAI"], ["A", "1,5"], ["A", ""], ["B", "2,25"]])
+    assert not pd.api.types.is_numeric_dtype(df["NILAI"])
+    hasil = pivot_engine.hitung_pivot(df, ["STO"], [], "NILAI", "sum")
+    assert hasil["NILAI"].tolist() == [1.5, 2.25, 3.75]
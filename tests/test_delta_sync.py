@@ -0,0 +1,113 @@
+import pandas as pd
+import pytest
+
+import data_prep
+import fake_sheets
+import sheets_client
+import sumber_data
+
+
+# --- DELTASYNC: HASIL SYNC BERTAHAP HARUS SAMA DENGAN MEMBANGUN ULANG DARI SEMUA BARIS ---
+@pytest.fixture
+def tab():
+    rows = fake_sheets.buat_data_psb(1200)
+    client = fake_sheets.FakeClient({"SHEET": {"PSB": rows}})
+    pool = sheets_client.SheetsPool(lambda: None, authorize=client.authorize)
+    return rows, sheets_client.DeltaSync(pool, "SHEET", "PSB", overlap=20, blok_cek=100)
+
+
+def ambil(delta_sync):
+    return sumber_data.ambil_delta(delta_sync, "SHEET", "PSB")
+
+
+def cek_sama(df, rows):
+    penuh = data_prep.buat_dataframe([list(row) for row in rows])
+    pd.testing.assert_frame_equal(df, penuh, check_categorical=False)
+
+
+def putar_blok(delta_sync, rows):
+    # Cukup sync untuk memeriksa setiap blok sekali
+    for _ in range(len(rows) // 100 + 1):
+        df = ambil(delta_sync)
+    return df
+
+
+def test_full_sync_pertama_tidak_menyimpan_semua_baris(tab):
+    rows, delta_sync = tab
+    cek_sama(ambil(delta_sync), rows)
+    assert delta_sync.stats["full"] == 1
+    assert len(delta_sync._akhir) <= 100 + 20
+    assert len(delta_sync._digest) == len(rows) // 100
+
+
+def test_baris_baru_ditambahkan_ke_frame(tab):
+    rows, delta_sync = tab
+    ambil(delta_sync)
+    rows.extend(fake_sheets.buat_data_psb(250, seed=1)[1:])
+    df = ambil(delta_sync)
+    assert delta_sync.stats == {"full": 1, "delta": 1, "baris_baru": 250}
+    cek_sama(df, rows)
+    assert df.attrs["versi"] == data_prep.buat_dataframe(rows).attrs["versi"]
+
+
+def test_tanpa_baris_baru_frame_dipakai_ulang(tab):
+    rows, delta_sync = tab
+    df = ambil(delta_sync)
+    assert ambil(delta_sync) is df
+    assert delta_sync.stats["full"] == 1
+
+
+def test_baris_baru_yang_mengubah_tipe_kolom_membangun_ulang(tab):
+    rows, delta_sync = tab
+    ambil(delta_sync)
+    baru = fake_sheets.buat_data_psb(5, seed=2)[1:]
+    baru[0][7] = ""  # kolom angka jadi teks kalau ada sel kosong
+    rows.extend(baru)
+    df = ambil(delta_sync)
+    assert delta_sync.stats["full"] == 2
+    cek_sama(df, rows)
+
+
+def test_edit_baris_lama_terdeteksi(tab):
+    rows, delta_sync = tab
+    ambil(delta_sync)
+    rows[150][4] = "TEKNISI BARU"
+    df = putar_blok(delta_sync, rows)
+    assert delta_sync.stats["full"] == 2
+    cek_sama(df, rows)
+
+
+def test_edit_di_overlap_terdeteksi(tab):
+    rows, delta_sync = tab
+    ambil(delta_sync)
+    rows[-1][6] = "PS BARU"
+    df = ambil(delta_sync)
+    assert delta_sync.stats["full"] == 2
+    cek_sama(df, rows)
+
+
+def test_hapus_baris_terdeteksi(tab):
+    rows, delta_sync = tab
+    ambil(delta_sync)
+    del rows[420]
+    df = putar_blok(delta_sync, rows)
+    assert delta_sync.stats["full"] == 2
+    cek_sama(df, rows)
+
+
+def test_header_berubah_terdeteksi(tab):
+    rows, delta_sync = tab
+    ambil(delta_sync)
+    rows[0][3] = "STO BARU"
+    df = ambil(delta_sync)
+    assert delta_sync.stats["full"] == 2
+    assert "STO BARU" in df.columns
+    cek_sama(df, rows)
+
+
+def test_reset_memaksa_full_sync(tab):
+    rows, delta_sync = tab
+    ambil(delta_sync)
+    delta_sync.reset()
+    ambil(delta_sync)
+    assert delta_sync.stats["full"] == 2
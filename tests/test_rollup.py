@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+import data_prep
+import fake_sheets
+import filter_index
+import konfigurasi
+import pivot_engine
+
+DIMENSI = konfigurasi.ROLLUP_DIMENSI[(konfigurasi.SECOND_SPREADSHEET_ID, konfigurasi.TAB_NAME_RAW_DATA)]
+
+# (rows, cols, values): semua kolom ada di salah satu cube
+PIVOT = [
+    (["BULAN"], [], "QTY"),
+    (["TEKNISI"], ["STATUS"], "NILAI"),
+    (["TANGGAL"], ["STATUS"], "QTY"),
+    (["STO", "JENIS ORDER"], ["STATUS"], "NILAI"),
+    (["BULAN"], ["STATUS"], "STO"),
+]
+
+FILTER = [
+    None,
+    (("STATUS", ("PS", "CANCEL")),),
+    (("BULAN", ("MARET",)), ("STATUS", ("PS",))),
+]
+
+
+# --- PIVOT DARI ROLLUP HARUS SAMA PERSIS DENGAN PIVOT DARI DATA MENTAH ---
+@pytest.fixture(scope="module")
+def data():
+    df = data_prep.buat_dataframe(fake_sheets.buat_data_psb(20000, jumlah_teknisi=30))
+    return df, pivot_engine.buat_daftar_rollup(df, DIMENSI), filter_index.FilterIndex(df), pivot_engine.UrutanKolom(df)
+
+
+def test_semua_cube_terbentuk(data):
+    _, rollup, _, _ = data
+    assert len(rollup) == len(DIMENSI)
+
+
+@pytest.mark.parametrize("kunci_filter", FILTER)
+@pytest.mark.parametrize("agg_func", ["count", "sum", "mean", "min", "max"])
+@pytest.mark.parametrize("rows, cols, values", PIVOT)
+def test_rollup_sama_dengan_data_mentah(data, rows, cols, values, agg_func, kunci_filter):
+    df, rollup, indeks, urutan = data
+    # Seperti di app: frame yang masuk sudah difilter, cube menerapkan kunci_filter sendiri
+    mentah = df if kunci_filter is None else indeks.terapkan(df, kunci_filter)
+    dengan = pivot_engine.hitung_pivot(mentah, rows, cols, values, agg_func, rollup, kunci_filter, urutan)
+    tanpa = pivot_engine.hitung_pivot(mentah, rows, cols, values, agg_func, urutan=urutan)
+    pd.testing.assert_frame_equal(dengan, tanpa)
+
+
+@pytest.mark.parametrize("agg_func", ["count", "sum"])
+def test_rollup_benar_benar_dipakai(data, agg_func):
+    _, rollup, _, _ = data
+    rows, cols, values = PIVOT[1]
+    assert any(pivot_engine.pivot_dari_rollup(cube, None, rows, cols, values, agg_func) is not None for cube in rollup)